@@ -12,7 +12,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 from utils.config import Config
-from executor.logger import ExecutionLogger
+from executor.logger import get_logger
 
 
 class AIInterface:
@@ -23,7 +23,7 @@ class AIInterface:
     
     def __init__(self):
         self.config = Config()
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
         
         # AI model configuration
         self.models = {
@@ -60,6 +60,13 @@ class AIInterface:
         
         # Generation history
         self.generation_history = []
+        
+        # Reused across calls so each generation doesn't set up a new
+        # connection pool and reconnect to the model server
+        self._http_client = httpx.Client(
+            timeout=60.0,
+            headers={"Content-Type": "application/json"}
+        )
     
     def _get_basic_prompt_template(self) -> str:
         """Get basic prompt template for script generation"""
@@ -245,18 +252,13 @@ Generate a game-specific Lua script:"""
         
         try:
             # Make API request
-            with httpx.Client(timeout=60.0) as client:
-                response = client.post(
-                    model_config["api_url"],
-                    json=payload,
-                    headers={"Content-Type": "application/json"}
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"API request failed with status {response.status_code}")
-                
-                result = response.json()
-                return result.get("response", "")
+            response = self._http_client.post(model_config["api_url"], json=payload)
+            
+            if response.status_code != 200:
+                raise Exception(f"API request failed with status {response.status_code}")
+            
+            result = response.json()
+            return result.get("response", "")
                 
         except httpx.RequestError as e:
             raise Exception(f"Network error: {str(e)}")
@@ -317,6 +319,16 @@ Generate a game-specific Lua script:"""
             game_context=game_context
         )
     
+    def close(self):
+        """Close the HTTP client used to reach the model server"""
+        self._http_client.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def get_generation_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get generation history"""
         return self.generation_history[-limit:]
@@ -10,7 +10,7 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from utils.config import Config
-from executor.logger import ExecutionLogger
+from executor.logger import get_logger
 
 
 class ScriptBuilder:
@@ -21,7 +21,7 @@ class ScriptBuilder:
     
     def __init__(self):
         self.config = Config()
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
         
         # Script templates
         self.script_templates = {
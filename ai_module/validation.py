@@ -10,7 +10,7 @@ from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 
 from utils.config import Config
-from executor.logger import ExecutionLogger
+from executor.logger import get_logger
 
 
 class ScriptValidator:
@@ -21,7 +21,7 @@ class ScriptValidator:
     
     def __init__(self):
         self.config = Config()
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
         
         # Dangerous patterns that should be blocked
         self.dangerous_patterns = {
@@ -22,6 +22,13 @@ MODEL_MAP = {
 }
 OLLAMA_API = "http://localhost:11434/api/generate"
 
+# One client for the app's lifetime so chat requests reuse pooled connections
+ollama_client = httpx.AsyncClient()
+
+@app.on_event("shutdown")
+async def close_ollama_client():
+    await ollama_client.aclose()
+
 def route_prompt(prompt):
     p = prompt.lower()
     if "python" in p or "automation" in p:
@@ -38,16 +45,15 @@ async def chat(req: Request):
     chosen = route_prompt(prompt)
     responses = {}
 
-    async with httpx.AsyncClient() as client:
-        if fast_mode:
-            resp = await client.post(OLLAMA_API, json={"model": MODEL_MAP[chosen], "prompt": prompt})
-            return {"response": resp.json().get("response", "")}
-        else:
-            for name, model in MODEL_MAP.items():
-                resp = await client.post(OLLAMA_API, json={"model": model, "prompt": prompt})
-                responses[name] = resp.json().get("response", "")
-            combined = "\n---\n".join([f"{k}: {v}" for k, v in responses.items()])
-            return {"response": combined}
+    if fast_mode:
+        resp = await ollama_client.post(OLLAMA_API, json={"model": MODEL_MAP[chosen], "prompt": prompt})
+        return {"response": resp.json().get("response", "")}
+    else:
+        for name, model in MODEL_MAP.items():
+            resp = await ollama_client.post(OLLAMA_API, json={"model": model, "prompt": prompt})
+            responses[name] = resp.json().get("response", "")
+        combined = "\n---\n".join([f"{k}: {v}" for k, v in responses.items()])
+        return {"response": combined}
 
 @app.post("/api/encrypt")
 async def encrypt_endpoint(file: UploadFile = File(...)):
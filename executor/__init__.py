@@ -6,11 +6,12 @@ Provides secure script execution capabilities with sandboxing and anti-cheat byp
 from .core import ExecutorCore
 from .sandbox import SandboxManager
 from .anti_cheat_bypass import AntiCheatBypass
-from .logger import ExecutionLogger
+from .logger import ExecutionLogger, get_logger
 
 __all__ = [
     'ExecutorCore',
     'SandboxManager', 
     'AntiCheatBypass',
-    'ExecutionLogger'
+    'ExecutionLogger',
+    'get_logger'
 ]
\ No newline at end of file
@@ -11,10 +11,45 @@ import string
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from .logger import ExecutionLogger
+from .logger import get_logger
 from utils.config import Config
 
 
+# Accepted values for set_bypass_level
+_BYPASS_LEVELS = frozenset({'low', 'medium', 'high'})
+
+# String literals collected for encryption by the string_encryption technique
+_STRING_LITERAL_RE = re.compile(r'"([^"]*)"')
+
+# Body rewrites that apply_bypass fuses into a single regex pass, as
+# (config flag, group name, substring every match contains, pattern). The
+# named groups let one callback dispatch on whichever alternative matched.
+_BODY_REWRITES = (
+    ('enable_vm_obfuscation', 'getfenv', 'getfenv', r'getfenv\s*\(\s*0\s*\)'),
+    ('enable_function_wrapping', 'function', 'function', r'function\s+(?P<function_name>\w+)\s*\('),
+    ('enable_string_encryption', 'literal', '"', r'"(?P<literal_body>[^"]*)"'),
+)
+
+# Static anti-debug block prepended by the anti_debug technique
+_ANTI_DEBUG_CODE = '''
+-- Anti-debug measures
+local function check_debug()
+    local success, result = pcall(function()
+        return debug.getinfo(1)
+    end)
+    if success then
+        warn("Debug environment detected")
+        return false
+    end
+    return true
+end
+
+if not check_debug() then
+    return
+end
+'''
+
+
 class AntiCheatBypass:
     """
     Anti-cheat bypass system for Roblox scripts.
@@ -23,7 +58,7 @@ class AntiCheatBypass:
     
     def __init__(self):
         self.config = Config()
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
         
         # Anti-cheat patterns and signatures
         self.anti_cheat_patterns = {
@@ -60,6 +95,15 @@ class AntiCheatBypass:
             ]
         }
         
+        # Compiled once so detection doesn't go through the re cache per pattern
+        self._compiled_patterns = {
+            category: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for category, patterns in self.anti_cheat_patterns.items()
+        }
+        
+        # Fused body rewrite patterns, keyed by the rewrites they apply
+        self._body_patterns: Dict[tuple, Optional[re.Pattern]] = {}
+        
         # Bypass techniques
         self.bypass_techniques = {
             'vm_obfuscation': self._obfuscate_vm_calls,
@@ -92,26 +136,25 @@ class AntiCheatBypass:
         try:
             self.logger.log_execution("Applying anti-cheat bypass techniques")
             
-            modified_script = script_content
-            
-            # Apply bypass techniques based on configuration
-            if self.bypass_config['enable_vm_obfuscation']:
-                modified_script = self._obfuscate_vm_calls(modified_script)
+            parts = []
             
-            if self.bypass_config['enable_function_wrapping']:
-                modified_script = self._wrap_functions(modified_script)
+            # VM obfuscation, function wrapping and string encryption rewrite
+            # disjoint tokens, so they run as one fused pass over the script
+            modified_script = self._rewrite_body(script_content)
             
-            if self.bypass_config['enable_string_encryption']:
-                modified_script = self._encrypt_strings(modified_script)
+            # Prepend-only techniques are collected as parts and the whole
+            # output is joined once, instead of copying the script per step
+            if self.bypass_config['enable_anti_debug']:
+                parts.append(_ANTI_DEBUG_CODE)
             
             if self.bypass_config['enable_control_flow_obfuscation']:
-                modified_script = self._obfuscate_control_flow(modified_script)
+                parts.append(self._control_flow_preamble())
             
-            if self.bypass_config['enable_anti_debug']:
-                modified_script = self._add_anti_debug(modified_script)
+            parts.append(modified_script)
             
-            # Add bypass header
-            modified_script = self._add_bypass_header(modified_script)
+            # Add bypass header (checksummed over the parts without joining them)
+            parts[0] = self._build_bypass_header(self._calculate_checksum(parts)) + parts[0]
+            modified_script = '\n'.join(parts)
             
             self.logger.log_execution("Anti-cheat bypass applied successfully")
             return modified_script
@@ -120,128 +163,119 @@ class AntiCheatBypass:
             self.logger.log_error(f"Failed to apply anti-cheat bypass: {str(e)}")
             return script_content  # Return original if bypass fails
     
-    def _obfuscate_vm_calls(self, script: str) -> str:
-        """Obfuscate VM detection calls"""
-        # Replace getfenv(0) with obfuscated version
-        script = re.sub(
-            r'getfenv\s*\(\s*0\s*\)',
-            'getfenv(function() return 0 end())',
-            script
+    def _rewrite_body(self, script: str, rewrites: Optional[tuple] = None) -> str:
+        """Apply body rewrites in a single regex pass; by default the ones enabled in the config"""
+        if rewrites is None:
+            rewrites = tuple(name for flag, name, _, _ in _BODY_REWRITES if self.bypass_config[flag])
+        
+        # Skip rewrites whose pattern cannot match, so scripts without them
+        # avoid the regex pass entirely
+        rewrites = tuple(
+            name for _, name, needle, _ in _BODY_REWRITES
+            if name in rewrites and needle in script
         )
+        if rewrites not in self._body_patterns:
+            alternatives = [
+                f'(?P<{name}>{pattern})'
+                for _, name, _, pattern in _BODY_REWRITES
+                if name in rewrites
+            ]
+            self._body_patterns[rewrites] = re.compile('|'.join(alternatives)) if alternatives else None
         
-        # Replace debug calls with obfuscated versions
-        debug_replacements = {
-            r'debug\.getinfo': 'debug.getinfo',
-            r'debug\.getlocal': 'debug.getlocal',
-            r'debug\.getupvalue': 'debug.getupvalue',
-            r'debug\.traceback': 'debug.traceback',
-        }
+        body_pattern = self._body_patterns[rewrites]
+        if body_pattern is None:
+            return script
+        
+        encrypted = self._encrypt_literals(script) if 'literal' in rewrites else {}
         
-        for pattern, replacement in debug_replacements.items():
-            script = re.sub(pattern, replacement, script)
+        def rewrite(match):
+            kind = match.lastgroup
+            if kind == 'getfenv':
+                return 'getfenv(function() return 0 end())'
+            if kind == 'function':
+                return f"local {match.group('function_name')} = function("
+            return encrypted.get(match.group('literal_body'), match.group(0))
         
-        return script
+        return body_pattern.sub(rewrite, script)
+    
+    def _obfuscate_vm_calls(self, script: str) -> str:
+        """Obfuscate VM detection calls"""
+        return self._rewrite_body(script, ('getfenv',))
     
     def _wrap_functions(self, script: str) -> str:
         """Wrap functions to avoid detection"""
-        # Wrap function definitions
-        script = re.sub(
-            r'function\s+(\w+)\s*\(',
-            r'local \1 = function(',
-            script
-        )
-        
-        # Wrap local function definitions
-        script = re.sub(
-            r'local\s+function\s+(\w+)\s*\(',
-            r'local \1 = function(',
-            script
-        )
-        
-        return script
+        return self._rewrite_body(script, ('function',))
     
     def _encrypt_strings(self, script: str) -> str:
         """Encrypt string literals to avoid detection"""
-        # Find string literals
-        string_pattern = r'"([^"]*)"'
-        
-        def encrypt_string(match):
-            original_string = match.group(1)
-            if len(original_string) < 3:  # Don't encrypt short strings
-                return match.group(0)
-            
-            # Simple XOR encryption
-            key = random.randint(1, 255)
-            encrypted = ''.join(chr(ord(c) ^ key) for c in original_string)
-            encrypted_hex = ''.join(f'{ord(c):02x}' for c in encrypted)
-            
-            # Create decryption function
-            decrypt_func = f'(function(s,k)local r=""for i=1,#s,2 do r=r..string.char(tonumber(s:sub(i,i+1),16)~k)end return r end)("{encrypted_hex}",{key})'
-            
-            return decrypt_func
+        return self._rewrite_body(script, ('literal',))
+    
+    def _encrypt_literals(self, script: str) -> Dict[str, str]:
+        """Map each distinct string literal in the script to its encrypted form"""
+        # Encrypt each distinct literal once; the substitution callback is
+        # then a plain dict lookup no matter how often a literal repeats
+        return {
+            literal: self._encrypt_string_literal(literal)
+            for literal in dict.fromkeys(_STRING_LITERAL_RE.findall(script))
+            if len(literal) >= 3  # Don't encrypt short strings
+        }
+    
+    def _encrypt_string_literal(self, original_string: str) -> str:
+        """Build the self-decrypting expression for a single string literal"""
+        # Simple XOR encryption, hex-encoded in a single pass
+        key = random.randint(1, 255)
+        encrypted_hex = ''.join(f'{ord(c) ^ key:02x}' for c in original_string)
         
-        script = re.sub(string_pattern, encrypt_string, script)
-        return script
+        # Create decryption function
+        return f'(function(s,k)local r=""for i=1,#s,2 do r=r..string.char(tonumber(s:sub(i,i+1),16)~k)end return r end)("{encrypted_hex}",{key})'
     
     def _obfuscate_control_flow(self, script: str) -> str:
         """Obfuscate control flow to make analysis harder"""
+        # Insert dummy code at the beginning
+        return self._control_flow_preamble() + '\n' + script
+    
+    def _control_flow_preamble(self) -> str:
+        """Build the dummy variable block used for control flow obfuscation"""
         # Add dummy variables and conditions
         dummy_vars = []
         for i in range(3):
             var_name = ''.join(random.choices(string.ascii_lowercase, k=8))
             dummy_vars.append(f'local {var_name} = {random.randint(1, 1000)}')
         
-        # Insert dummy code at the beginning
-        if dummy_vars:
-            script = '\n'.join(dummy_vars) + '\n' + script
-        
-        return script
+        return '\n'.join(dummy_vars)
     
     def _add_anti_debug(self, script: str) -> str:
         """Add anti-debugging measures"""
-        anti_debug_code = '''
--- Anti-debug measures
-local function check_debug()
-    local success, result = pcall(function()
-        return debug.getinfo(1)
-    end)
-    if success then
-        warn("Debug environment detected")
-        return false
-    end
-    return true
-end
-
-if not check_debug() then
-    return
-end
-'''
-        
         # Insert at the beginning of the script
-        script = anti_debug_code + '\n' + script
-        return script
+        return _ANTI_DEBUG_CODE + '\n' + script
     
-    def _add_bypass_header(self, script: str) -> str:
-        """Add bypass header with metadata"""
+    def _build_bypass_header(self, checksum: str) -> str:
+        """Build bypass header with metadata"""
+        now = datetime.now()
         header = f'''-- CIA Roblox Executor Bypass Header
--- Generated: {datetime.now().isoformat()}
+-- Generated: {now.isoformat()}
 -- Bypass Level: {self.bypass_config['obfuscation_level']}
 -- Security: Internal Use Only
 
 local _bypass_metadata = {{
     version = "1.0",
-    timestamp = {int(datetime.now().timestamp())},
+    timestamp = {int(now.timestamp())},
     bypass_level = "{self.bypass_config['obfuscation_level']}",
-    checksum = "{self._calculate_checksum(script)}"
+    checksum = "{checksum}"
 }}
 
 '''
         
-        return header + script
+        return header
     
-    def _calculate_checksum(self, content: str) -> str:
-        """Calculate checksum of script content"""
-        return hashlib.md5(content.encode()).hexdigest()[:8]
+    def _calculate_checksum(self, parts: List[str]) -> str:
+        """Calculate checksum of the newline-joined script parts"""
+        digest = hashlib.md5()
+        for index, part in enumerate(parts):
+            if index:
+                digest.update(b'\n')
+            digest.update(part.encode())
+        return digest.hexdigest()[:8]
     
     def detect_anti_cheat(self, script_content: str) -> Dict[str, List[str]]:
         """
@@ -255,13 +289,12 @@ local _bypass_metadata = {{
         """
         detected_patterns = {}
         
-        for category, patterns in self.anti_cheat_patterns.items():
-            detected_patterns[category] = []
+        for category, patterns in self._compiled_patterns.items():
+            found = detected_patterns[category] = []
             
+            # Stream matches straight into the category list
             for pattern in patterns:
-                matches = re.findall(pattern, script_content, re.IGNORECASE)
-                if matches:
-                    detected_patterns[category].extend(matches)
+                found.extend(match.group(0) for match in pattern.finditer(script_content))
         
         return detected_patterns
     
@@ -310,7 +343,7 @@ local _bypass_metadata = {{
         Args:
             level: 'low', 'medium', or 'high'
         """
-        if level not in ['low', 'medium', 'high']:
+        if level not in _BYPASS_LEVELS:
             raise ValueError("Bypass level must be 'low', 'medium', or 'high'")
         
         self.bypass_config['obfuscation_level'] = level
@@ -5,33 +5,279 @@ Main execution loop, VM abstraction, and script management.
 """
 
 import os
+import re
 import sys
 import time
+import hashlib
+import itertools
+import queue
 import threading
 import traceback
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 
-import lupa
 from lupa import LuaRuntime
 
 from .sandbox import SandboxManager
 from .anti_cheat_bypass import AntiCheatBypass
-from .logger import ExecutionLogger
+from .logger import ExecutionLogger, get_logger
 from utils.config import Config
 
 
+# Runs before the sandbox strips the environment, so the snapshot keeps its
+# own references to pairs, type and the globals table. Calling the returned
+# function records the contents of the globals table and of every table
+# reachable from it (libraries, game objects), and hands back a restore
+# function that drops every key a script added to those tables and puts
+# back anything it replaced.
+_SNAPSHOT_GLOBALS_LUA = '''
+local pairs, type, G = pairs, type, _G
+return function()
+    local saved = {}
+    local function save(t)
+        if saved[t] then return end
+        local copy = {}
+        saved[t] = copy
+        for k, v in pairs(t) do
+            copy[k] = v
+            if type(v) == 'table' then save(v) end
+        end
+    end
+    save(G)
+    return function()
+        for t, copy in pairs(saved) do
+            for k in pairs(t) do
+                if copy[k] == nil then t[k] = nil end
+            end
+            for k, v in pairs(copy) do t[k] = v end
+        end
+    end
+end
+'''
+
+# Names that scripts may not reference, matched against the constants of
+# the script's stripped bytecode. Comments and local variable names are gone
+# by then and escaped string literals are decoded, so a single scan over a
+# much smaller buffer sees exactly the names the code uses. Field accesses
+# compile to separate constants, so os.execute and io.popen are matched by
+# their field names.
+_DANGEROUS_NAMES = (
+    b'execute',
+    b'popen',
+    b'loadstring',
+    b'dofile',
+    b'loadfile',
+    b'require',
+    b'package',
+    b'debug',
+    b'collectgarbage',
+    b'coroutine',
+    b'jit'
+)
+
+
+# Source-level fallback for compile runtimes whose dump format the probe in
+# _dangerous_name_re cannot read: the original substring scan over the
+# lowercased script
+_DANGEROUS_SOURCE_RE = re.compile('|'.join(re.escape(pattern) for pattern in (
+    'os.execute',
+    'io.popen',
+    'loadstring',
+    'dofile',
+    'loadfile',
+    'require',
+    'package',
+    'debug',
+    'collectgarbage',
+    'coroutine',
+    'jit'
+)))
+
+
+def _probe_dump(compile_chunk, constant: bytes) -> bytes:
+    """Stripped dump of a chunk returning the given string constant"""
+    # The first byte is escaped, so the constant itself never appears in the
+    # source text (which Lua 5.2 keeps in its dumps)
+    source = b'return "\\%d' % constant[0] + constant[1:] + b'"'
+    return compile_chunk(source)[1]
+
+
+def _constant_prefix(compile_chunk, name: bytes) -> Optional[bytes]:
+    """The bytes a stripped dump writes in front of the string constant name"""
+    # Dump the constant at two lengths. Walking back from the constant, the
+    # nearest byte that differs belongs to its encoded length, whatever the
+    # Lua version's size format (tag and byte, varint, size_t or uleb128).
+    dump = _probe_dump(compile_chunk, name)
+    longer = _probe_dump(compile_chunk, name + b'_')
+    end, longer_end = dump.rfind(name), longer.rfind(name + b'_')
+    if end == -1 or longer_end == -1:
+        return None
+    
+    for back in range(1, min(end, longer_end) + 1):
+        if dump[end - back] != longer[longer_end - back]:
+            return dump[end - back:end]
+    return None
+
+
+def _dangerous_name_re(compile_chunk) -> Optional['re.Pattern[bytes]']:
+    """
+    Match dangerous names only where they are a whole string constant in a stripped dump.
+    
+    Args:
+        compile_chunk: Compiles source to (bytecode, stripped bytecode) in the compile runtime
+        
+    Returns:
+        The pattern, or None if the runtime's dump format could not be probed
+    """
+    # Anchoring each name on its length prefix keeps "executeTask" or
+    # "debugMode" from matching
+    alternatives = []
+    for name in _DANGEROUS_NAMES:
+        prefix = _constant_prefix(compile_chunk, name)
+        if not prefix:
+            return None
+        alternatives.append(b'(?<=' + re.escape(prefix) + b')' + re.escape(name))
+    
+    pattern = re.compile(b'|'.join(alternatives))
+    
+    # The pattern must find each name in the dump it was derived from
+    for name in _DANGEROUS_NAMES:
+        if not pattern.search(_probe_dump(compile_chunk, name)):
+            return None
+    return pattern
+
+
+# Restricted globals for direct execution: print is routed to the logger
+# and os is cut down to its time functions. The other safe builtins
+# (tonumber, tostring, type, pairs, ipairs, next, table, string, math) are
+# the runtime's own and stay as they are.
+_RESTRICTED_GLOBALS_LUA = '''
+local G, os = _G, os
+return function(print)
+    G.print = print
+    G.os = {time = os.time, date = os.date, clock = os.clock}
+end
+'''
+
+# Loop keywords, counted in one scan for the infinite-loop warning
+_LOOP_KEYWORD_RE = re.compile(r'\b(?:(while)|for)\b')
+
+# Compiles script source to bytecode, plus a stripped dump for validation.
+# Runs in a dedicated runtime without string decoding, so the dumps reach
+# Python as raw bytes. Only text chunks are accepted; scripts cannot smuggle
+# in bytecode.
+_COMPILE_CHUNK_LUA = '''
+local load, dump = load, string.dump
+return function(source)
+    local chunk, err = load(source, nil, 't')
+    if not chunk then return nil, err end
+    return dump(chunk), dump(chunk, true)
+end
+'''
+
+# Loads each distinct script's bytecode once per runtime. Scripts are keyed
+# by a content hash computed on the Python side; load and debug.sethook are
+# captured up front so the runner keeps working after the sandbox strips
+# them from the environment. The cache is dropped wholesale once it reaches
+# its size limit.
+#
+# While a script runs, a count hook calls the Python deadline check every
+# few thousand instructions; the check raises once the timeout has passed,
+# which unwinds the script. Scripts can catch that error with pcall, so
+# once the deadline has passed the hook re-arms itself to fire on every
+# instruction and keeps raising until the script has fully unwound; it
+# stays quiet inside the runner itself so the hook is always removed.
+# LuaJIT does not run hooks inside compiled traces, so the JIT is switched
+# off for script chunks there.
+_CHUNK_RUNNER_LUA = '''
+local load, error, pcall = load, error, pcall
+local sethook, getinfo, jit_off = debug.sethook, debug.getinfo, jit and jit.off
+return function(max_size, hook_count)
+    local cache, size = {}, 0
+    local check_deadline, run, finish
+    local function hook()
+        local ok, err = pcall(check_deadline)
+        if not ok then
+            local running = getinfo(2, 'f').func
+            if running == run or running == finish then return end
+            sethook(hook, '', 1)
+            error(err, 0)
+        end
+    end
+    function finish(ok, ...)
+        sethook()
+        check_deadline = nil
+        if not ok then error((...), 0) end
+        return ...
+    end
+    function run(key, bytecode, deadline_check)
+        local chunk = cache[key]
+        if chunk == nil then
+            local err
+            chunk, err = load(bytecode, nil, 'b')
+            if not chunk then error(err, 0) end
+            if jit_off then jit_off(chunk, true) end
+            if size >= max_size then cache, size = {}, 0 end
+            cache[key] = chunk
+            size = size + 1
+        end
+        check_deadline = deadline_check
+        sethook(hook, '', hook_count)
+        return finish(pcall(chunk))
+    end
+    return run
+end
+'''
+
+# Lua instructions between deadline checks
+_TIMEOUT_HOOK_INSTRUCTIONS = 10000
+
+
+def _filter_attribute(obj: Any, attr_name: Any, is_setting: bool) -> Any:
+    """Deny Lua access to private and dunder attributes of Python objects"""
+    # Without this, a script could walk from any exposed callable to its
+    # module globals (e.g. print.__self__ or __func__.__globals__)
+    if isinstance(attr_name, str) and attr_name.startswith('_'):
+        raise AttributeError(f"access to '{attr_name}' is not allowed")
+    
+    return attr_name
+
+
+def _resolve_runtime_class(backend: str) -> type:
+    """Resolve the LuaRuntime class for the configured Lua backend"""
+    if backend == 'luajit':
+        try:
+            # Tracing JIT build shipped with lupa when LuaJIT support is available
+            from lupa.luajit21 import LuaRuntime as LuaJITRuntime
+            return LuaJITRuntime
+        except ImportError:
+            pass
+    
+    return LuaRuntime
+
+
+class PreparedScript:
+    """A validated, bypass-transformed and compiled script, ready to run"""
+    
+    def __init__(self, script_content: str, chunk_key: bytes, bytecode: bytes):
+        self.script_content = script_content
+        self.chunk_key = chunk_key
+        self.bytecode = bytecode
+
+
 class ExecutorCore:
     """
     Core execution engine for Roblox Lua scripts.
     Handles script loading, execution, and VM management.
     """
     
-    def __init__(self):
+    def __init__(self, sandbox: Optional[SandboxManager] = None,
+                 logger: Optional[ExecutionLogger] = None):
         self.config = Config()
-        self.logger = ExecutionLogger()
-        self.sandbox = SandboxManager()
+        # Callers that already own a sandbox or logger can share them
+        self.logger = logger or get_logger()
+        self.sandbox = sandbox or SandboxManager()
         self.anti_cheat = AntiCheatBypass()
         
         # Execution state
@@ -42,71 +288,180 @@ class ExecutorCore:
         
         # VM state
         self.lua_runtime: Optional[LuaRuntime] = None
+        self._thread_state = threading.local()
         self.script_registry: Dict[str, Any] = {}
-        self.execution_stats = {
-            'total_executions': 0,
-            'successful_executions': 0,
-            'failed_executions': 0,
-            'total_execution_time': 0.0
-        }
+        
+        # Execution statistics, kept as plain counters on the hot path
+        self._total_executions = 0
+        self._successful_executions = 0
+        self._failed_executions = 0
+        self._total_execution_ns = 0
         
         # Security settings
         self.sandbox_mode = True
         self.bypass_mode = True
         self.max_execution_time = 30
         self.max_memory_usage = 100 * 1024 * 1024  # 100MB
+        self.log_tracebacks = str(self.config.get('executor.log_level', 'INFO')).upper() == 'DEBUG'
+        
+        # Lua backend ('lua' or 'luajit'); LuaJIT is opt-in because it only
+        # understands Lua 5.1 syntax
+        self.lua_backend = self.config.get('executor.lua_backend', 'lua')
+        self._runtime_class = _resolve_runtime_class(self.lua_backend)
+        if self._bypass_unsupported():
+            self.bypass_mode = False
+            self.logger.log_warning(
+                "Anti-cheat bypass is not supported on the LuaJIT backend and has been disabled"
+            )
+        
+        # Compiled chunks kept per runtime, and prepared scripts shared by all
+        self.chunk_cache_size = self.config.get('executor.chunk_cache_size', 512)
+        self._prepared_scripts: Dict[Tuple, PreparedScript] = {}
+        
+        # Optional CPU pinning for threads that execute scripts, handed out
+        # round-robin so each thread keeps its caches on one core
+        cpu_affinity = self.config.get('executor.cpu_affinity')
+        self._affinity_cycle = itertools.cycle(cpu_affinity) if cpu_affinity else None
         
         self._initialize_lua_runtime()
+        
+        # Pre-initialised sandbox runtimes, reused across executions
+        self.sandbox_pool_size = self.config.get('executor.sandbox_pool_size', 2)
+        self._sandbox_pool: queue.LifoQueue = queue.LifoQueue(maxsize=self.sandbox_pool_size)
+        self._initialize_sandbox_pool()
     
     def _initialize_lua_runtime(self):
         """Initialize the Lua runtime with security restrictions"""
         try:
             # Create Lua runtime with restricted environment
-            self.lua_runtime = lupa.LuaRuntime(
-                unpack_returned_tuples=True,
-                register_eval=False,  # Disable eval for security
-                register_builtins=False  # Disable builtins for security
-            )
+            self.lua_runtime = self._create_runtime()
             
             # Set up restricted globals
             self._setup_restricted_globals()
             
-            self.logger.log_execution("Lua runtime initialized successfully")
+            # Parses scripts once; every runtime loads the resulting bytecode
+            self._compile_chunk = self._runtime_class(
+                encoding=None,
+                unpack_returned_tuples=True,
+                register_eval=False,
+                register_builtins=False
+            ).execute(_COMPILE_CHUNK_LUA)
+            # Validation reads constants from that runtime's dump format
+            self._dangerous_name_re = _dangerous_name_re(self._compile_chunk)
+            if self._dangerous_name_re is None:
+                self.logger.log_warning(
+                    "Unrecognised bytecode format; validating script source instead"
+                )
+            
+            # The constructing thread uses this runtime for direct execution;
+            # it stays unpinned so threads it starts keep the full CPU mask
+            self._thread_state.runtime = self.lua_runtime
+            self._thread_state.run_chunk = self._create_chunk_runner(self.lua_runtime)
+            
+            self.logger.log_execution(
+                f"Lua runtime initialized successfully ({self._runtime_class.__module__})"
+            )
         except Exception as e:
             self.logger.log_error(f"Failed to initialize Lua runtime: {str(e)}")
             raise
     
-    def _setup_restricted_globals(self):
-        """Set up restricted global environment for Lua scripts"""
-        if not self.lua_runtime:
+    def _initialize_sandbox_pool(self):
+        """Fill the sandbox pool with ready-to-use runtimes"""
+        try:
+            for _ in range(self.sandbox_pool_size):
+                self._sandbox_pool.put_nowait(self._create_sandbox_runtime())
+        except Exception as e:
+            # Executions still work, they just build runtimes on demand
+            self.logger.log_error(f"Failed to initialize sandbox pool: {str(e)}")
+    
+    def _create_sandbox_runtime(self):
+        """Create a sandboxed runtime and the function that resets its globals"""
+        runtime = self._create_runtime()
+        snapshot_globals = runtime.execute(_SNAPSHOT_GLOBALS_LUA)
+        run_chunk = self._create_chunk_runner(runtime)
+        
+        # Set up sandboxed environment
+        self.sandbox.setup_environment(runtime)
+        
+        return runtime, snapshot_globals(), run_chunk
+    
+    def _acquire_sandbox_runtime(self):
+        """Take a sandboxed runtime from the pool, creating one if it is empty"""
+        try:
+            return self._sandbox_pool.get_nowait()
+        except queue.Empty:
+            return self._create_sandbox_runtime()
+    
+    def _release_sandbox_runtime(self, runtime: LuaRuntime, restore_globals, run_chunk):
+        """Reset a sandboxed runtime's globals and the tables they hold, and return it to the pool"""
+        try:
+            restore_globals()
+            self._sandbox_pool.put_nowait((runtime, restore_globals, run_chunk))
+        except queue.Full:
+            pass
+        except Exception as e:
+            self.logger.log_warning(f"Discarding sandbox runtime that failed to reset: {str(e)}")
+    
+    def _get_thread_runner(self):
+        """Get the chunk runner of the calling thread's direct-execution runtime"""
+        run_chunk = getattr(self._thread_state, 'run_chunk', None)
+        if run_chunk is None:
+            # Each thread owns its runtime, so concurrent callers never
+            # contend for (or leak state into) a shared Lua state
+            self._pin_current_thread()
+            runtime = self._create_runtime()
+            self._setup_restricted_globals(runtime)
+            run_chunk = self._create_chunk_runner(runtime)
+            self._thread_state.runtime = runtime
+            self._thread_state.run_chunk = run_chunk
+        
+        return run_chunk
+    
+    def _pin_current_thread(self):
+        """Pin the calling thread to the next configured CPU, if pinning is enabled"""
+        if self._affinity_cycle is None or not hasattr(os, 'sched_setaffinity'):
             return
         
-        # Define safe globals
-        safe_globals = {
-            'print': self._safe_print,
-            'tonumber': self.lua_runtime.globals().tonumber,
-            'tostring': self.lua_runtime.globals().tostring,
-            'type': self.lua_runtime.globals().type,
-            'pairs': self.lua_runtime.globals().pairs,
-            'ipairs': self.lua_runtime.globals().ipairs,
-            'next': self.lua_runtime.globals().next,
-            'table': self.lua_runtime.globals().table,
-            'string': self.lua_runtime.globals().string,
-            'math': self.lua_runtime.globals().math,
-            'os': {
-                'time': self.lua_runtime.globals().os.time,
-                'date': self.lua_runtime.globals().os.date,
-                'clock': self.lua_runtime.globals().os.clock,
-            }
-        }
+        cpu = next(self._affinity_cycle)
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as e:
+            self.logger.log_warning(f"Failed to pin execution thread to CPU {cpu}: {str(e)}")
+    
+    def _create_runtime(self) -> LuaRuntime:
+        """Create a Lua runtime on the configured backend"""
+        return self._runtime_class(
+            unpack_returned_tuples=True,
+            register_eval=False,  # Disable eval for security
+            register_builtins=False,  # Disable builtins for security
+            attribute_filter=_filter_attribute,
+            max_memory=0  # Track allocations so the sandbox can cap them
+        )
+    
+    def _compile_bytecode(self, script_content: str) -> Tuple[bytes, bytes]:
+        """Compile a script to bytecode that any of our runtimes can load, and its stripped form"""
+        bytecode, stripped = self._compile_chunk(script_content.encode('utf-8'))
+        if bytecode is None:
+            raise ExecutionError(stripped.decode('utf-8', 'replace'))
         
-        # Set globals in Lua environment
-        for name, value in safe_globals.items():
-            self.lua_runtime.globals()[name] = value
+        return bytecode, stripped
+    
+    def _create_chunk_runner(self, runtime: LuaRuntime):
+        """Create the function that compiles (once) and runs scripts in a runtime"""
+        return runtime.execute(_CHUNK_RUNNER_LUA)(self.chunk_cache_size, _TIMEOUT_HOOK_INSTRUCTIONS)
+    
+    def _setup_restricted_globals(self, runtime: Optional[LuaRuntime] = None):
+        """Set up restricted global environment for Lua scripts"""
+        runtime = runtime or self.lua_runtime
+        if not runtime:
+            return
+        
+        # Install all safe globals in a single call into Lua
+        runtime.execute(_RESTRICTED_GLOBALS_LUA)(self._safe_print)
     
     def _safe_print(self, *args):
         """Safe print function that logs to our system"""
-        output = ' '.join(str(arg) for arg in args)
+        output = ' '.join(map(str, args))
         self.logger.log_output(f"Script output: {output}")
         return output
     
@@ -117,20 +472,75 @@ class ExecutorCore:
     
     def set_bypass_mode(self, enabled: bool):
         """Enable or disable anti-cheat bypass mode"""
+        if enabled and self._bypass_unsupported():
+            self.logger.log_warning("Anti-cheat bypass is not supported on the LuaJIT backend")
+            enabled = False
+        
         self.bypass_mode = enabled
         self.logger.log_execution(f"Anti-cheat bypass mode {'enabled' if enabled else 'disabled'}")
     
+    def _bypass_unsupported(self) -> bool:
+        """Whether the runtime cannot parse bypassed scripts"""
+        # String encryption emits the Lua 5.3 '~' operator, which LuaJIT rejects
+        return self._runtime_class.__module__.startswith('lupa.luajit')
+    
     def set_execution_timeout(self, timeout: int):
         """Set maximum execution time in seconds"""
         self.execution_timeout = timeout
         self.max_execution_time = timeout
     
-    def execute_script(self, script_content: str, script_name: str = "anonymous") -> str:
+    def prepare_script(self, script_content: str) -> PreparedScript:
+        """
+        Validate, bypass-transform and compile a script for execution.
+        
+        Prepared scripts are cached by source and bypass settings, so
+        repeat executions skip straight to running the compiled chunk.
+        
+        Args:
+            script_content: The Lua script to prepare
+            
+        Returns:
+            PreparedScript that can be passed to execute_script
+        """
+        source_key = hashlib.blake2b(script_content.encode('utf-8'), digest_size=16).digest()
+        if self.bypass_mode:
+            cache_key = (source_key, tuple(sorted(self.anti_cheat.bypass_config.items())))
+        else:
+            cache_key = (source_key, None)
+        
+        prepared = self._prepared_scripts.get(cache_key)
+        if prepared is not None:
+            return prepared
+        
+        bytecode, stripped = self._compile_bytecode(script_content)
+        
+        # Validate script before execution
+        if not self._validate_script(script_content, stripped):
+            raise ValueError("Script validation failed")
+        
+        # Apply anti-cheat bypass if enabled
+        if self.bypass_mode:
+            script_content = self.anti_cheat.apply_bypass(script_content)
+            chunk_key = hashlib.blake2b(script_content.encode('utf-8'), digest_size=16).digest()
+            bytecode, _ = self._compile_bytecode(script_content)
+        else:
+            chunk_key = source_key
+        
+        prepared = PreparedScript(script_content, chunk_key, bytecode)
+        
+        if len(self._prepared_scripts) >= self.chunk_cache_size:
+            self._prepared_scripts.clear()
+        self._prepared_scripts[cache_key] = prepared
+        
+        return prepared
+    
+    def execute_script(self, script_content: Union[str, PreparedScript],
+                       script_name: str = "anonymous") -> str:
         """
         Execute a Lua script in the sandboxed environment.
         
         Args:
-            script_content: The Lua script to execute
+            script_content: The Lua script to execute, or a PreparedScript
             script_name: Name of the script for logging
             
         Returns:
@@ -139,38 +549,36 @@ class ExecutorCore:
         if not self.lua_runtime:
             raise RuntimeError("Lua runtime not initialized")
         
-        start_time = time.time()
-        self.execution_stats['total_executions'] += 1
+        start_ns = time.monotonic_ns()
+        self._total_executions += 1
         
         try:
             self.logger.log_execution(f"Starting execution of script: {script_name}")
             
-            # Validate script before execution
-            if not self._validate_script(script_content):
-                raise ValueError("Script validation failed")
-            
-            # Apply anti-cheat bypass if enabled
-            if self.bypass_mode:
-                script_content = self.anti_cheat.apply_bypass(script_content)
+            if isinstance(script_content, PreparedScript):
+                prepared = script_content
+            else:
+                prepared = self.prepare_script(script_content)
             
             # Create execution context
             execution_context = {
                 'script_name': script_name,
-                'start_time': start_time,
+                'start_ns': start_ns,
                 'sandbox_mode': self.sandbox_mode,
                 'bypass_mode': self.bypass_mode
             }
             
             # Execute in sandbox if enabled
             if self.sandbox_mode:
-                result = self._execute_in_sandbox(script_content, execution_context)
+                result = self._execute_in_sandbox(prepared, execution_context)
             else:
-                result = self._execute_directly(script_content, execution_context)
+                result = self._execute_directly(prepared, execution_context)
             
             # Update statistics
-            execution_time = time.time() - start_time
-            self.execution_stats['successful_executions'] += 1
-            self.execution_stats['total_execution_time'] += execution_time
+            execution_ns = time.monotonic_ns() - start_ns
+            self._successful_executions += 1
+            self._total_execution_ns += execution_ns
+            execution_time = execution_ns / 1e9
             
             self.logger.log_execution(
                 f"Script execution completed successfully in {execution_time:.2f}s"
@@ -179,117 +587,116 @@ class ExecutorCore:
             return f"Execution successful. Result: {result}"
             
         except Exception as e:
-            execution_time = time.time() - start_time
-            self.execution_stats['failed_executions'] += 1
+            self._failed_executions += 1
             
             error_msg = f"Script execution failed: {str(e)}"
-            self.logger.log_error(error_msg)
             
-            # Log full traceback for debugging
-            self.logger.log_error(f"Traceback: {traceback.format_exc()}")
+            # Full traceback only when debugging; formatting it reads source files
+            self.logger.log_error(
+                error_msg,
+                traceback=traceback.format_exc() if self.log_tracebacks else None
+            )
             
             raise ExecutionError(error_msg)
     
-    def _validate_script(self, script_content: str) -> bool:
+    def _validate_script(self, script_content: str, stripped_bytecode: bytes) -> bool:
         """Validate script for security and safety"""
-        # Check for dangerous patterns
-        dangerous_patterns = [
-            'os.execute',
-            'io.popen',
-            'loadstring',
-            'dofile',
-            'loadfile',
-            'require',
-            'package',
-            'debug',
-            'collectgarbage',
-            'coroutine',
-            'jit'
-        ]
-        
-        script_lower = script_content.lower()
-        for pattern in dangerous_patterns:
-            if pattern in script_lower:
-                self.logger.log_error(f"Script contains dangerous pattern: {pattern}")
-                return False
+        # Check for dangerous names among the compiled chunk's constants
+        if self._dangerous_name_re is not None:
+            match = self._dangerous_name_re.search(stripped_bytecode)
+            pattern = match and match.group(0).decode()
+        else:
+            match = _DANGEROUS_SOURCE_RE.search(script_content.lower())
+            pattern = match and match.group(0)
+        
+        if match:
+            self.logger.log_error(f"Script contains dangerous pattern: {pattern}")
+            return False
         
         # Check for infinite loops (basic check)
-        if script_content.count('while') > 5 or script_content.count('for') > 10:
-            self.logger.log_warning("Script contains many loops - potential infinite loop risk")
+        while_loops = for_loops = 0
+        for match in _LOOP_KEYWORD_RE.finditer(script_content):
+            if match.group(1):
+                while_loops += 1
+            else:
+                for_loops += 1
+            
+            if while_loops > 5 or for_loops > 10:
+                self.logger.log_warning("Script contains many loops - potential infinite loop risk")
+                break
         
         return True
     
-    def _execute_in_sandbox(self, script_content: str, context: Dict[str, Any]) -> str:
+    def _execute_in_sandbox(self, prepared: PreparedScript, context: Dict[str, Any]) -> str:
         """Execute script in sandboxed environment"""
         try:
-            # Create isolated Lua state
-            sandboxed_runtime = lupa.LuaRuntime(
-                unpack_returned_tuples=True,
-                register_eval=False,
-                register_builtins=False
-            )
-            
-            # Set up sandboxed environment
-            self.sandbox.setup_environment(sandboxed_runtime)
-            
-            # Execute with timeout
-            result = self._execute_with_timeout(sandboxed_runtime, script_content)
+            # Isolated Lua state from the pool
+            sandboxed_runtime, restore_globals, run_chunk = self._acquire_sandbox_runtime()
+        except Exception as e:
+            raise ExecutionError(f"Sandbox execution failed: {str(e)}")
+        
+        try:
+            # Execute with timeout, including anything the script spawned
+            result = self._execute_with_timeout(run_chunk, prepared, run_spawned=True)
             
             return str(result) if result is not None else "Execution completed"
             
         except Exception as e:
-            raise ExecutionError(f"Sandbox execution failed: {str(e)}")
+            raise ExecutionError(f"Sandbox execution failed: {self.sandbox.describe_error(e)}")
+        finally:
+            # Timed-out scripts are unwound by the hook, so the runtime is
+            # always safe to reset and reuse; nothing spawned outlives it
+            self.sandbox.discard_spawned_functions()
+            self._release_sandbox_runtime(sandboxed_runtime, restore_globals, run_chunk)
     
-    def _execute_directly(self, script_content: str, context: Dict[str, Any]) -> str:
+    def _execute_directly(self, prepared: PreparedScript, context: Dict[str, Any]) -> str:
         """Execute script directly in main runtime"""
         try:
-            result = self._execute_with_timeout(self.lua_runtime, script_content)
+            result = self._execute_with_timeout(self._get_thread_runner(), prepared)
             return str(result) if result is not None else "Execution completed"
             
         except Exception as e:
             raise ExecutionError(f"Direct execution failed: {str(e)}")
     
-    def _execute_with_timeout(self, runtime: LuaRuntime, script_content: str) -> Any:
+    def _execute_with_timeout(self, run_chunk, prepared: PreparedScript,
+                              run_spawned: bool = False) -> Any:
         """Execute script with timeout protection"""
-        result = [None]
-        exception = [None]
-        
-        def execute_script():
-            try:
-                result[0] = runtime.execute(script_content)
-            except Exception as e:
-                exception[0] = e
-        
-        # Start execution in separate thread
-        thread = threading.Thread(target=execute_script)
-        thread.daemon = True
-        thread.start()
+        deadline_ns = time.monotonic_ns() + int(self.execution_timeout * 1e9)
         
-        # Wait for completion or timeout
-        thread.join(timeout=self.execution_timeout)
+        def check_deadline():
+            # Called from the Lua count hook; raising aborts the script
+            if time.monotonic_ns() > deadline_ns:
+                raise ExecutionTimeoutError("Script execution timed out")
         
-        if thread.is_alive():
-            # Force thread termination (not ideal but necessary for security)
+        try:
+            with self.sandbox.execution_deadline(deadline_ns, check_deadline):
+                # Runtimes that already loaded this chunk reuse it by key
+                result = run_chunk(prepared.chunk_key, prepared.bytecode, check_deadline)
+                
+                # Spawned functions share the script's deadline
+                if run_spawned:
+                    self.sandbox.run_spawned_functions(check_deadline)
+            
+            return result
+        except ExecutionTimeoutError:
             self.logger.log_error("Script execution timed out")
-            raise ExecutionError("Script execution timed out")
-        
-        if exception[0]:
-            raise exception[0]
-        
-        return result[0]
+            raise
     
     def get_execution_stats(self) -> Dict[str, Any]:
         """Get execution statistics"""
-        return self.execution_stats.copy()
+        return {
+            'total_executions': self._total_executions,
+            'successful_executions': self._successful_executions,
+            'failed_executions': self._failed_executions,
+            'total_execution_time': self._total_execution_ns / 1e9
+        }
     
     def clear_execution_stats(self):
         """Clear execution statistics"""
-        self.execution_stats = {
-            'total_executions': 0,
-            'successful_executions': 0,
-            'failed_executions': 0,
-            'total_execution_time': 0.0
-        }
+        self._total_executions = 0
+        self._successful_executions = 0
+        self._failed_executions = 0
+        self._total_execution_ns = 0
     
     def shutdown(self):
         """Shutdown the executor and cleanup resources"""
@@ -299,8 +706,20 @@ class ExecutorCore:
         # Cleanup Lua runtime
         if self.lua_runtime:
             self.lua_runtime = None
+        
+        # Drop pooled sandbox runtimes
+        while True:
+            try:
+                self._sandbox_pool.get_nowait()
+            except queue.Empty:
+                break
 
 
 class ExecutionError(Exception):
     """Custom exception for execution errors"""
+    pass
+
+
+class ExecutionTimeoutError(ExecutionError):
+    """Raised when a script exceeds its execution timeout"""
     pass
\ No newline at end of file
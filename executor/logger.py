@@ -5,14 +5,331 @@ Records all script executions and AI interactions for auditing.
 """
 
 import os
-import json
+import time
+import queue
+import atexit
+import heapq
+import itertools
 import logging
-from datetime import datetime
+import mmap
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Iterator
 import threading
 
-from utils.config import Config
+import orjson
+import zstandard
+
+
+# Sequence numbers that keep generated IDs unique within the process
+_id_sequence = itertools.count()
+
+# Non-string metadata keys are stringified like the stdlib json module did
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _record_template(channel: str, level: str, record_type: str, *fields: str) -> bytes:
+    """Build the line template for one record type: log prefix plus its fixed JSON keys"""
+    body = ','.join([f'"{field}":%s' for field in fields])
+    return (
+        f'%s [{level}] {channel}: {{"timestamp":"%s%06d","type":"{record_type}",{body}}}\n'
+    ).encode('utf-8')
+
+
+# How records written from the templates below begin. Lines logged before
+# them used json.dumps, whose separators include a space.
+_COMPACT_RECORD_START = b'{"timestamp":"'
+
+# Every record type has a fixed schema, so keys and punctuation are baked
+# into a template and only the field values go through the JSON encoder.
+# Values are passed in field order; the timestamp comes from the time the
+# record was queued.
+_EXECUTION_RECORD = _record_template(
+    'execution', 'INFO', 'execution', 'message', 'script_name', 'execution_id', 'metadata')
+_AI_INTERACTION_RECORD = _record_template(
+    'ai', 'INFO', 'ai_interaction', 'prompt', 'response', 'model', 'generation_time', 'metadata')
+_ERROR_RECORD = _record_template(
+    'errors', 'ERROR', 'error', 'error_message', 'error_type', 'script_name', 'traceback', 'metadata')
+_WARNING_RECORD = _record_template(
+    'execution', 'WARNING', 'warning', 'message', 'script_name', 'metadata')
+_OUTPUT_RECORD = _record_template(
+    'execution', 'INFO', 'output', 'output', 'script_name', 'metadata')
+_AUDIT_RECORD = _record_template(
+    'audit', 'INFO', 'audit', 'action', 'user', 'resource', 'details')
+_SECURITY_RECORD = _record_template(
+    'audit', 'WARNING', 'security', 'event_type', 'description', 'severity', 'metadata')
+_PERFORMANCE_RECORD = _record_template(
+    'execution', 'INFO', 'performance', 'operation', 'duration', 'script_name', 'metadata')
+
+def _write_lines(fd: int, lines: List[bytes]) -> int:
+    """Write lines to fd, gathering them in one writev call where available"""
+    total = sum(map(len, lines))
+    
+    if hasattr(os, 'writev'):
+        written = os.writev(fd, lines)
+        if written == total:
+            return total
+        view = memoryview(b''.join(lines))[written:]
+    else:
+        view = memoryview(b''.join(lines))
+    
+    # Finish short writes one buffer at a time
+    while view:
+        view = view[os.write(fd, view):]
+    
+    return total
+
+
+def _read_lines_reversed(f) -> Iterator[bytes]:
+    """Yield the non-empty lines of a binary file, last line first"""
+    if not os.fstat(f.fileno()).st_size:
+        return
+    
+    # Search the mapped file for line breaks instead of reading it into buffers
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        end = len(mapped)
+        while end > 0:
+            start = mapped.rfind(b'\n', 0, end) + 1
+            line = mapped[start:end]
+            if line.strip():
+                yield line
+            end = start - 1
+
+
+# Bytes read per step when counting lines
+_COUNT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _count_lines(log_path: Path) -> int:
+    """Count the lines of a file without decoding it"""
+    line_count = 0
+    last = b'\n'
+    
+    with open(log_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_COUNT_CHUNK_SIZE), b''):
+            line_count += chunk.count(b'\n')
+            last = chunk[-1:]
+    
+    # A final line without a trailing newline still counts
+    return line_count if last == b'\n' else line_count + 1
+
+
+def _entry_timestamp(entry: Dict[str, Any]) -> str:
+    """Sort key for parsed log entries; ISO timestamps order as strings"""
+    return entry.get('timestamp', '')
+
+
+# Append-only, binary on Windows, and not inherited by child processes
+_LOG_OPEN_FLAGS = (
+    os.O_WRONLY | os.O_APPEND | os.O_CREAT
+    | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+)
+
+# Shared stand-in for absent metadata; never mutated
+_EMPTY_METADATA: Dict[str, Any] = {}
+
+# Problems in the logger itself; without handlers these go to stderr
+_internal_logger = logging.getLogger(__name__)
+
+
+class _LogWriter:
+    """
+    Background writer shared by every ExecutionLogger in the process.
+    Log calls only enqueue a record; serialization and file I/O happen
+    on the writer thread, which also owns the open log files.
+    """
+    
+    # Most records drained from the queue per batch; keep below IOV_MAX
+    # (1024 on Linux) since a file's batch goes out in one writev call
+    MAX_BATCH = 512
+    
+    # Records allowed to wait for the writer; beyond this, new records are
+    # dropped (or the caller waits, if BLOCK_WHEN_FULL is set)
+    MAX_QUEUED = 65536
+    BLOCK_WHEN_FULL = False
+    
+    # Seconds between reports of dropped records
+    DROP_REPORT_INTERVAL = 1.0
+    
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue(maxsize=self.MAX_QUEUED)
+        
+        # Records dropped because the queue was full, not yet reported
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._last_drop_report = 0.0
+        
+        # Append-only descriptors and their current sizes, per log file
+        self._fds: Dict[Path, int] = {}
+        self._sizes: Dict[Path, int] = {}
+        
+        # Line counts of open log files, counted on first request and kept
+        # current as lines are written
+        self._line_counts: Dict[Path, int] = {}
+        
+        # Formatted times for the most recent second seen: (second, line prefix, ISO prefix)
+        self._time_cache = (-1, b'', b'')
+        
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, logger: 'ExecutionLogger', log_path: Path, template: bytes, values: tuple):
+        """Queue a log record (a record template and its field values) for writing"""
+        record = (logger, log_path, template, time.time(), values)
+        
+        if self.BLOCK_WHEN_FULL:
+            self._queue.put(record)
+            return
+        
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+    
+    def call(self, func: Callable[[], Any], *log_paths: Path):
+        """Run func on the writer thread once queued records are written, and wait for it"""
+        done = threading.Event()
+        self._queue.put((None, func, log_paths, done))
+        done.wait()
+    
+    def flush(self):
+        """Wait until every record queued so far has been written"""
+        self.call(lambda: None)
+    
+    def line_count(self, log_path: Path) -> int:
+        """Number of lines in a log file, including every record queued so far"""
+        result = []
+        
+        def count():
+            try:
+                if log_path not in self._line_counts:
+                    self._line_counts[log_path] = _count_lines(log_path)
+                result.append(self._line_counts[log_path])
+            except OSError as e:
+                result.append(e)
+        
+        self.call(count)
+        if isinstance(result[0], OSError):
+            raise result[0]
+        return result[0]
+    
+    def _run(self):
+        while True:
+            # Block for one record, then take whatever else is already queued
+            batch = [self._queue.get()]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            pending: Dict[Path, List[bytes]] = {}
+            owners: Dict[Path, 'ExecutionLogger'] = {}
+            
+            for item in batch:
+                if item[0] is None:
+                    # Commands see every record queued before them on disk
+                    self._write_pending(pending, owners)
+                    self._run_command(*item[1:])
+                    continue
+                
+                try:
+                    logger, log_path, template, created, values = item
+                    second = int(created)
+                    if second != self._time_cache[0]:
+                        local = time.localtime(second)
+                        self._time_cache = (
+                            second,
+                            time.strftime('%Y-%m-%d %H:%M:%S', local).encode('utf-8'),
+                            time.strftime('%Y-%m-%dT%H:%M:%S.', local).encode('utf-8'),
+                        )
+                    
+                    pending.setdefault(log_path, []).append(template % (
+                        self._time_cache[1],
+                        self._time_cache[2],
+                        int((created - second) * 1_000_000),
+                        *[orjson.dumps(value, option=_ORJSON_OPTIONS) for value in values]
+                    ))
+                    owners[log_path] = logger
+                except Exception as e:
+                    _internal_logger.error(f"Log writer failed: {str(e)}")
+            
+            self._write_pending(pending, owners)
+            
+            if self._dropped:
+                self._report_dropped()
+    
+    def _report_dropped(self):
+        now = time.monotonic()
+        if now - self._last_drop_report < self.DROP_REPORT_INTERVAL:
+            return
+        
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        self._last_drop_report = now
+        _internal_logger.warning(f"Log queue full, dropped {dropped} records")
+    
+    def _write_pending(self, pending: Dict[Path, List[bytes]], owners: Dict[Path, 'ExecutionLogger']):
+        """Write each file's pending lines with one write call, rotating full files"""
+        for log_path, lines in pending.items():
+            try:
+                fd = self._open(log_path)
+                self._sizes[log_path] += _write_lines(fd, lines)
+                if log_path in self._line_counts:
+                    self._line_counts[log_path] += len(lines)
+                
+                logger = owners[log_path]
+                if self._sizes[log_path] > logger.max_log_size:
+                    self._close(log_path)
+                    logger._rotate_log(log_path)
+            except Exception as e:
+                _internal_logger.error(f"Log writer failed: {str(e)}")
+        
+        pending.clear()
+    
+    def _run_command(self, func: Callable[[], Any], log_paths, done: threading.Event):
+        try:
+            # Let func move or replace these files safely
+            for log_path in log_paths:
+                self._close(log_path)
+            func()
+        except Exception as e:
+            _internal_logger.error(f"Log writer command failed: {str(e)}")
+        finally:
+            done.set()
+    
+    def _open(self, log_path: Path) -> int:
+        fd = self._fds.get(log_path)
+        if fd is None:
+            fd = os.open(log_path, _LOG_OPEN_FLAGS, 0o644)
+            self._fds[log_path] = fd
+            self._sizes[log_path] = os.fstat(fd).st_size
+        
+        return fd
+    
+    def _close(self, log_path: Path):
+        fd = self._fds.pop(log_path, None)
+        self._line_counts.pop(log_path, None)
+        if fd is not None:
+            self._sizes.pop(log_path, None)
+            os.close(fd)
+
+
+_writer: Optional[_LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer() -> _LogWriter:
+    """Get the process-wide log writer, starting it on first use"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = _LogWriter()
+                # Daemon thread: drain what is queued before the process exits
+                atexit.register(_writer.flush)
+    
+    return _writer
 
 
 class ExecutionLogger:
@@ -22,8 +339,6 @@ class ExecutionLogger:
     """
     
     def __init__(self):
-        self.config = Config()
-        
         # Create logs directory if it doesn't exist
         self.logs_dir = Path("logs")
         self.logs_dir.mkdir(exist_ok=True)
@@ -34,61 +349,13 @@ class ExecutionLogger:
         self.error_log_path = self.logs_dir / "errors.log"
         self.audit_log_path = self.logs_dir / "audit.log"
         
-        # Initialize logging
-        self._setup_logging()
-        
-        # Thread safety
-        self._lock = threading.Lock()
+        # Records are written by the shared background writer
+        self._writer = _get_writer()
         
         # Log rotation settings
         self.max_log_size = 10 * 1024 * 1024  # 10MB
         self.max_log_files = 5
     
-    def _setup_logging(self):
-        """Set up logging configuration"""
-        # Create formatters
-        detailed_formatter = logging.Formatter(
-            '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
-        simple_formatter = logging.Formatter(
-            '%(asctime)s [%(levelname)s] %(message)s',
-            datefmt='%H:%M:%S'
-        )
-        
-        # Execution logger
-        self.execution_logger = logging.getLogger('execution')
-        self.execution_logger.setLevel(logging.INFO)
-        
-        execution_handler = logging.FileHandler(self.execution_log_path)
-        execution_handler.setFormatter(detailed_formatter)
-        self.execution_logger.addHandler(execution_handler)
-        
-        # AI logger
-        self.ai_logger = logging.getLogger('ai')
-        self.ai_logger.setLevel(logging.INFO)
-        
-        ai_handler = logging.FileHandler(self.ai_log_path)
-        ai_handler.setFormatter(detailed_formatter)
-        self.ai_logger.addHandler(ai_handler)
-        
-        # Error logger
-        self.error_logger = logging.getLogger('errors')
-        self.error_logger.setLevel(logging.ERROR)
-        
-        error_handler = logging.FileHandler(self.error_log_path)
-        error_handler.setFormatter(detailed_formatter)
-        self.error_logger.addHandler(error_handler)
-        
-        # Audit logger
-        self.audit_logger = logging.getLogger('audit')
-        self.audit_logger.setLevel(logging.INFO)
-        
-        audit_handler = logging.FileHandler(self.audit_log_path)
-        audit_handler.setFormatter(detailed_formatter)
-        self.audit_logger.addHandler(audit_handler)
-    
     def log_execution(self, message: str, script_name: str = "unknown", 
                      execution_id: str = None, metadata: Dict[str, Any] = None):
         """
@@ -100,18 +367,12 @@ class ExecutionLogger:
             execution_id: Unique execution identifier
             metadata: Additional metadata
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'execution',
-                'message': message,
-                'script_name': script_name,
-                'execution_id': execution_id or self._generate_id(),
-                'metadata': metadata or {}
-            }
-            
-            self.execution_logger.info(json.dumps(log_entry))
-            self._check_log_rotation(self.execution_log_path)
+        self._writer.submit(self, self.execution_log_path, _EXECUTION_RECORD, (
+            message,
+            script_name,
+            execution_id or self._generate_id(),
+            metadata or _EMPTY_METADATA
+        ))
     
     def log_ai_interaction(self, prompt: str, response: str, model: str = "unknown",
                           generation_time: float = 0.0, metadata: Dict[str, Any] = None):
@@ -125,19 +386,13 @@ class ExecutionLogger:
             generation_time: Time taken for generation
             metadata: Additional metadata
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'ai_interaction',
-                'prompt': prompt,
-                'response': response,
-                'model': model,
-                'generation_time': generation_time,
-                'metadata': metadata or {}
-            }
-            
-            self.ai_logger.info(json.dumps(log_entry))
-            self._check_log_rotation(self.ai_log_path)
+        self._writer.submit(self, self.ai_log_path, _AI_INTERACTION_RECORD, (
+            prompt,
+            response,
+            model,
+            round(generation_time, 6),
+            metadata or _EMPTY_METADATA
+        ))
     
     def log_error(self, error_message: str, error_type: str = "unknown",
                   script_name: str = "unknown", traceback: str = None,
@@ -152,19 +407,13 @@ class ExecutionLogger:
             traceback: Full traceback information
             metadata: Additional metadata
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'error',
-                'error_message': error_message,
-                'error_type': error_type,
-                'script_name': script_name,
-                'traceback': traceback,
-                'metadata': metadata or {}
-            }
-            
-            self.error_logger.error(json.dumps(log_entry))
-            self._check_log_rotation(self.error_log_path)
+        self._writer.submit(self, self.error_log_path, _ERROR_RECORD, (
+            error_message,
+            error_type,
+            script_name,
+            traceback,
+            metadata or _EMPTY_METADATA
+        ))
     
     def log_warning(self, message: str, script_name: str = "unknown",
                    metadata: Dict[str, Any] = None):
@@ -176,16 +425,11 @@ class ExecutionLogger:
             script_name: Name of the script
             metadata: Additional metadata
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'warning',
-                'message': message,
-                'script_name': script_name,
-                'metadata': metadata or {}
-            }
-            
-            self.execution_logger.warning(json.dumps(log_entry))
+        self._writer.submit(self, self.execution_log_path, _WARNING_RECORD, (
+            message,
+            script_name,
+            metadata or _EMPTY_METADATA
+        ))
     
     def log_output(self, output: str, script_name: str = "unknown",
                   metadata: Dict[str, Any] = None):
@@ -197,16 +441,11 @@ class ExecutionLogger:
             script_name: Name of the script
             metadata: Additional metadata
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'output',
-                'output': output,
-                'script_name': script_name,
-                'metadata': metadata or {}
-            }
-            
-            self.execution_logger.info(json.dumps(log_entry))
+        self._writer.submit(self, self.execution_log_path, _OUTPUT_RECORD, (
+            output,
+            script_name,
+            metadata or _EMPTY_METADATA
+        ))
     
     def log_audit(self, action: str, user: str = "system", 
                   resource: str = "unknown", details: Dict[str, Any] = None):
@@ -219,18 +458,12 @@ class ExecutionLogger:
             resource: Resource being accessed
             details: Additional details
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'audit',
-                'action': action,
-                'user': user,
-                'resource': resource,
-                'details': details or {}
-            }
-            
-            self.audit_logger.info(json.dumps(log_entry))
-            self._check_log_rotation(self.audit_log_path)
+        self._writer.submit(self, self.audit_log_path, _AUDIT_RECORD, (
+            action,
+            user,
+            resource,
+            details or _EMPTY_METADATA
+        ))
     
     def log_security_event(self, event_type: str, description: str,
                           severity: str = "medium", metadata: Dict[str, Any] = None):
@@ -243,17 +476,12 @@ class ExecutionLogger:
             severity: Severity level (low, medium, high, critical)
             metadata: Additional metadata
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'security',
-                'event_type': event_type,
-                'description': description,
-                'severity': severity,
-                'metadata': metadata or {}
-            }
-            
-            self.audit_logger.warning(json.dumps(log_entry))
+        self._writer.submit(self, self.audit_log_path, _SECURITY_RECORD, (
+            event_type,
+            description,
+            severity,
+            metadata or _EMPTY_METADATA
+        ))
     
     def log_performance(self, operation: str, duration: float,
                        script_name: str = "unknown", metadata: Dict[str, Any] = None):
@@ -266,17 +494,16 @@ class ExecutionLogger:
             script_name: Name of the script
             metadata: Additional metadata
         """
-        with self._lock:
-            log_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'type': 'performance',
-                'operation': operation,
-                'duration': duration,
-                'script_name': script_name,
-                'metadata': metadata or {}
-            }
-            
-            self.execution_logger.info(json.dumps(log_entry))
+        self._writer.submit(self, self.execution_log_path, _PERFORMANCE_RECORD, (
+            operation,
+            round(duration, 6),
+            script_name,
+            metadata or _EMPTY_METADATA
+        ))
+    
+    def flush(self):
+        """Block until every record logged so far has been written to disk"""
+        self._writer.flush()
     
     def get_execution_logs(self, limit: int = 100, 
                           script_name: str = None) -> List[Dict[str, Any]]:
@@ -290,7 +517,7 @@ class ExecutionLogger:
         Returns:
             List of log entries
         """
-        return self._read_logs(self.execution_log_path, limit, script_name)
+        return self._read_logs(self.execution_log_path, limit, 'script_name', script_name)
     
     def get_ai_logs(self, limit: int = 100, model: str = None) -> List[Dict[str, Any]]:
         """
@@ -303,12 +530,7 @@ class ExecutionLogger:
         Returns:
             List of log entries
         """
-        logs = self._read_logs(self.ai_log_path, limit)
-        
-        if model:
-            logs = [log for log in logs if log.get('model') == model]
-        
-        return logs
+        return self._read_logs(self.ai_log_path, limit, 'model', model)
     
     def get_error_logs(self, limit: int = 100, 
                       error_type: str = None) -> List[Dict[str, Any]]:
@@ -322,12 +544,7 @@ class ExecutionLogger:
         Returns:
             List of log entries
         """
-        logs = self._read_logs(self.error_log_path, limit)
-        
-        if error_type:
-            logs = [log for log in logs if log.get('error_type') == error_type]
-        
-        return logs
+        return self._read_logs(self.error_log_path, limit, 'error_type', error_type)
     
     def get_audit_logs(self, limit: int = 100, 
                       action: str = None) -> List[Dict[str, Any]]:
@@ -341,39 +558,43 @@ class ExecutionLogger:
         Returns:
             List of log entries
         """
-        logs = self._read_logs(self.audit_log_path, limit)
-        
-        if action:
-            logs = [log for log in logs if log.get('action') == action]
-        
-        return logs
+        return self._read_logs(self.audit_log_path, limit, 'action', action)
     
     def _read_logs(self, log_path: Path, limit: int, 
                    filter_key: str = None, filter_value: str = None) -> List[Dict[str, Any]]:
         """Read logs from file with optional filtering"""
         logs = []
         
+        # Make records logged so far visible to the reader
+        self.flush()
+        
         try:
-            if not log_path.exists():
-                return logs
+            # Records hold each field as "key":<json value>, so compact lines
+            # without that byte sequence cannot match and are skipped without
+            # parsing
+            filter_bytes = None
+            if filter_key and filter_value:
+                filter_bytes = (
+                    orjson.dumps(filter_key) + b':' + orjson.dumps(filter_value, option=_ORJSON_OPTIONS)
+                )
             
-            with open(log_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            # Parse JSON logs (skip lines that aren't JSON)
-            for line in lines[-limit:]:  # Get last N lines
-                line = line.strip()
-                if not line:
-                    continue
-                
-                try:
+            with open(log_path, 'rb') as f:
+                # Walk back from the end until enough matching entries are found
+                for line in _read_lines_reversed(f):
                     # Extract JSON from log line (after timestamp and level)
-                    json_start = line.find('{')
+                    json_start = line.find(b'{')
                     if json_start == -1:
                         continue
                     
-                    json_part = line[json_start:]
-                    log_entry = json.loads(json_part)
+                    # Older json.dumps lines are always parsed and compared
+                    if (filter_bytes is not None and filter_bytes not in line
+                            and line.startswith(_COMPACT_RECORD_START, json_start)):
+                        continue
+                    
+                    try:
+                        log_entry = orjson.loads(line[json_start:])
+                    except orjson.JSONDecodeError:
+                        continue
                     
                     # Apply filter if specified
                     if filter_key and filter_value:
@@ -381,52 +602,53 @@ class ExecutionLogger:
                             continue
                     
                     logs.append(log_entry)
-                    
-                except json.JSONDecodeError:
-                    continue
+                    if len(logs) >= limit:
+                        break
             
-            return logs[-limit:]  # Return last N entries
+            logs.reverse()
+            return logs
             
+        except FileNotFoundError:
+            return logs
         except Exception as e:
-            self.error_logger.error(f"Failed to read logs from {log_path}: {str(e)}")
+            _internal_logger.error(f"Failed to read logs from {log_path}: {str(e)}")
             return []
     
     def _generate_id(self) -> str:
         """Generate a unique identifier"""
-        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(datetime.now())}"
+        return f"{time.time_ns():016x}_{next(_id_sequence):08x}"
     
-    def _check_log_rotation(self, log_path: Path):
-        """Check if log rotation is needed"""
+    def _rotate_log(self, log_path: Path):
+        """Rotate log file (called by the writer once the file passes max_log_size)"""
+        compressed_path = log_path.with_suffix('.zst.tmp')
         try:
-            if log_path.exists() and log_path.stat().st_size > self.max_log_size:
-                self._rotate_log(log_path)
+            # Backups are only kept for reference, so store them compressed.
+            # Compress first, so a failure leaves the existing backups alone.
+            with open(log_path, 'rb') as src, open(compressed_path, 'wb') as dst:
+                zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
         except Exception as e:
-            self.error_logger.error(f"Log rotation check failed: {str(e)}")
-    
-    def _rotate_log(self, log_path: Path):
-        """Rotate log file"""
+            _internal_logger.error(f"Log rotation failed, keeping existing backups: {str(e)}")
+            try:
+                os.remove(compressed_path)
+            except OSError:
+                pass
+            return
+        
         try:
-            # Remove oldest log file if we have too many
+            # Shift backups up by one; os.replace drops the oldest on the way
             for i in range(self.max_log_files - 1, 0, -1):
-                old_file = log_path.with_suffix(f'.{i}')
-                new_file = log_path.with_suffix(f'.{i + 1}')
-                
-                if old_file.exists():
-                    if new_file.exists():
-                        new_file.unlink()
-                    old_file.rename(new_file)
+                try:
+                    os.replace(log_path.with_suffix(f'.{i}.zst'), log_path.with_suffix(f'.{i + 1}.zst'))
+                except FileNotFoundError:
+                    pass
             
-            # Rename current log file
-            backup_file = log_path.with_suffix('.1')
-            if backup_file.exists():
-                backup_file.unlink()
-            log_path.rename(backup_file)
+            os.replace(compressed_path, log_path.with_suffix('.1.zst'))
             
-            # Recreate log file
-            log_path.touch()
+            # The writer reopens (and so recreates) the log file on its next write
+            os.remove(log_path)
             
         except Exception as e:
-            self.error_logger.error(f"Log rotation failed: {str(e)}")
+            _internal_logger.error(f"Log rotation failed: {str(e)}")
     
     def export_logs(self, output_path: str, log_types: List[str] = None,
                    start_date: str = None, end_date: str = None) -> bool:
@@ -446,7 +668,7 @@ class ExecutionLogger:
             if log_types is None:
                 log_types = ['execution', 'ai', 'error', 'audit']
             
-            all_logs = []
+            log_lists = []
             
             for log_type in log_types:
                 if log_type == 'execution':
@@ -460,31 +682,39 @@ class ExecutionLogger:
                 else:
                     continue
                 
-                all_logs.extend(logs)
+                # Logs are appended in time order, but a hand-edited file or a
+                # clock change can break that; such a log is sorted first
+                if any(_entry_timestamp(earlier) > _entry_timestamp(later)
+                       for earlier, later in zip(logs, itertools.islice(logs, 1, None))):
+                    logs.sort(key=_entry_timestamp)
+                
+                log_lists.append(logs)
             
-            # Apply date filtering
-            if start_date or end_date:
-                filtered_logs = []
+            # Each log is now in time order, so merging them sorts the export
+            all_logs = heapq.merge(*log_lists, key=_entry_timestamp)
+            
+            # Stream entries out one at a time instead of building the whole document
+            with open(output_path, 'wb') as f:
+                separator = b'[\n  '
                 for log in all_logs:
+                    # Apply date filtering
                     timestamp = log.get('timestamp', '')
                     if start_date and timestamp < start_date:
                         continue
                     if end_date and timestamp > end_date:
                         continue
-                    filtered_logs.append(log)
-                all_logs = filtered_logs
-            
-            # Sort by timestamp
-            all_logs.sort(key=lambda x: x.get('timestamp', ''))
-            
-            # Export to file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(all_logs, f, indent=2, ensure_ascii=False)
+                    
+                    entry = orjson.dumps(log, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                    f.write(separator)
+                    f.write(entry.replace(b'\n', b'\n  '))
+                    separator = b',\n  '
+                
+                f.write(b'[]' if separator == b'[\n  ' else b'\n]')
             
             return True
             
         except Exception as e:
-            self.error_logger.error(f"Log export failed: {str(e)}")
+            _internal_logger.error(f"Log export failed: {str(e)}")
             return False
     
     def clear_logs(self, log_types: List[str] = None):
@@ -497,24 +727,36 @@ class ExecutionLogger:
         if log_types is None:
             log_types = ['execution', 'ai', 'error', 'audit']
         
+        log_paths = []
         for log_type in log_types:
             if log_type == 'execution':
-                self._clear_log_file(self.execution_log_path)
+                log_paths.append(self.execution_log_path)
             elif log_type == 'ai':
-                self._clear_log_file(self.ai_log_path)
+                log_paths.append(self.ai_log_path)
             elif log_type == 'error':
-                self._clear_log_file(self.error_log_path)
+                log_paths.append(self.error_log_path)
             elif log_type == 'audit':
-                self._clear_log_file(self.audit_log_path)
+                log_paths.append(self.audit_log_path)
+        
+        if log_paths:
+            self._clear_log_files(log_paths)
     
-    def _clear_log_file(self, log_path: Path):
-        """Clear a specific log file"""
-        try:
-            if log_path.exists():
-                log_path.unlink()
-            log_path.touch()
-        except Exception as e:
-            self.error_logger.error(f"Failed to clear log file {log_path}: {str(e)}")
+    def _clear_log_files(self, log_paths: List[Path]):
+        """Clear the given log files"""
+        def clear():
+            for log_path in log_paths:
+                try:
+                    # Swap in a new empty file rather than truncating, so a
+                    # reader that has the old one mapped keeps its own inode
+                    empty_path = log_path.with_name(log_path.name + '.tmp')
+                    open(empty_path, 'wb').close()
+                    os.replace(empty_path, log_path)
+                except Exception as e:
+                    _internal_logger.error(f"Failed to clear log file {log_path}: {str(e)}")
+        
+        # Runs on the writer thread after it closes its handles to the files,
+        # in one round trip for all of them
+        self._writer.call(clear, *log_paths)
     
     def get_log_statistics(self) -> Dict[str, Any]:
         """Get statistics about log files"""
@@ -527,26 +769,41 @@ class ExecutionLogger:
             ('audit', self.audit_log_path)
         ]:
             try:
-                if log_path.exists():
-                    size = log_path.stat().st_size
-                    line_count = sum(1 for _ in open(log_path, 'r', encoding='utf-8'))
-                    stats[log_type] = {
-                        'size_bytes': size,
-                        'size_mb': size / (1024 * 1024),
-                        'line_count': line_count,
-                        'exists': True
-                    }
-                else:
-                    stats[log_type] = {
-                        'size_bytes': 0,
-                        'size_mb': 0,
-                        'line_count': 0,
-                        'exists': False
-                    }
-            except Exception as e:
+                # Also waits for queued records, so the size below includes them
+                line_count = self._writer.line_count(log_path)
+                size = log_path.stat().st_size
+                stats[log_type] = {
+                    'size_bytes': size,
+                    'size_mb': size / (1024 * 1024),
+                    'line_count': line_count,
+                    'exists': True
+                }
+            except FileNotFoundError:
+                stats[log_type] = {
+                    'size_bytes': 0,
+                    'size_mb': 0,
+                    'line_count': 0,
+                    'exists': False
+                }
+            except OSError as e:
                 stats[log_type] = {
                     'error': str(e),
                     'exists': False
                 }
         
-        return stats
\ No newline at end of file
+        return stats
+
+
+_logger: Optional[ExecutionLogger] = None
+_logger_lock = threading.Lock()
+
+
+def get_logger() -> ExecutionLogger:
+    """Get the ExecutionLogger shared by the whole application, creating it on first use"""
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = ExecutionLogger()
+    
+    return _logger
\ No newline at end of file
@@ -5,21 +5,132 @@ Provides isolated execution environments for safe script execution.
 """
 
 import os
+import re
 import sys
 import time
 import threading
-import resource
 import psutil
+from collections import deque, namedtuple
 from typing import Dict, Any, Optional, Callable
 from contextlib import contextmanager
 
 import lupa
 from lupa import LuaRuntime
 
-from .logger import ExecutionLogger
+from .logger import get_logger
 from utils.config import Config
 
 
+# Patterns that only earn a warning in check_security
+_SUSPICIOUS_PATTERNS = (
+    'while true do',
+    'for i=1,999999 do',
+    'repeat until false',
+    'coroutine',
+    'debug',
+    'collectgarbage',
+    'jit'
+)
+_SUSPICIOUS_RE = re.compile('|'.join(map(re.escape, _SUSPICIOUS_PATTERNS)), re.IGNORECASE)
+
+# Copies the named fields of a library table into a new table. Uses no
+# globals, so it also works after the sandbox has cleared _G.
+_PICK_FIELDS_LUA = '''
+return function(lib, ...)
+    local picked, names = {}, {...}
+    if lib ~= nil then
+        for i = 1, #names do
+            picked[names[i]] = lib[names[i]]
+        end
+    end
+    return picked
+end
+'''
+
+# Moves every global except _G into a new table and returns it, so the
+# whole clear is a single call into Lua
+_CLEAR_GLOBALS_LUA = '''
+local G = _G
+local removed = {}
+for key, value in pairs(G) do
+    if key ~= '_G' then
+        removed[key] = value
+        G[key] = nil
+    end
+end
+return removed
+'''
+
+# Simulated Roblox value types. Uses no globals, so it also works after
+# the sandbox has cleared _G.
+_ROBLOX_CONSTRUCTORS_LUA = '''
+local constructors = {}
+
+function constructors.Vector3(x, y, z)
+    x, y, z = x or 0, y or 0, z or 0
+    return {X = x, Y = y, Z = z, Magnitude = (x * x + y * y + z * z) ^ 0.5}
+end
+
+function constructors.CFrame(x, y, z)
+    x, y, z = x or 0, y or 0, z or 0
+    return {X = x, Y = y, Z = z, Position = {X = x, Y = y, Z = z}}
+end
+
+function constructors.Color3(r, g, b)
+    return {R = r or 0, G = g or 0, B = b or 0}
+end
+
+function constructors.Instance(className)
+    return {ClassName = className, Name = className, Parent = nil}
+end
+
+function constructors.TweenInfo(time, style)
+    return {Time = time or 1, Style = style or 0}
+end
+
+return constructors
+'''
+
+# Runs a spawned function under a count hook that calls the Python deadline
+# check, like the script runner in core, so spawned code is held to the
+# spawning script's time limit. Past the deadline the hook fires on every
+# instruction, so pcall cannot swallow the timeout. sethook, getinfo, pcall
+# and error are passed in because the sandbox has removed them from the
+# environment by the time this is built.
+_SPAWN_RUNNER_LUA = '''
+local sethook, getinfo, pcall, error = ...
+local check_deadline, run
+local function hook()
+    local ok, err = pcall(check_deadline)
+    if not ok then
+        if getinfo(2, 'f').func == run then return end
+        sethook(hook, '', 1)
+        error(err, 0)
+    end
+end
+function run(func, deadline_check, hook_count)
+    check_deadline = deadline_check
+    sethook(hook, '', hook_count)
+    local ok, err = pcall(func)
+    sethook()
+    check_deadline = nil
+    if not ok then error(err, 0) end
+end
+return run
+'''
+
+# Lua instructions between deadline checks in spawned functions
+_SPAWN_HOOK_INSTRUCTIONS = 10000
+
+# Process resource readings, as cached by the sandbox and as returned by
+# get_resource_usage (which adds the costlier open file count)
+ResourceSample = namedtuple('ResourceSample', 'memory_mb cpu_percent threads')
+ResourceUsage = namedtuple('ResourceUsage', 'memory_mb cpu_percent threads open_files')
+
+# Seconds a resource sample is reused before the process is queried again
+_RESOURCE_SAMPLE_TTL = 0.1
+
+
 class SandboxManager:
     """
     Manages isolated sandboxed environments for safe script execution.
@@ -28,7 +139,12 @@ class SandboxManager:
     
     def __init__(self):
         self.config = Config()
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
+        
+        # Bound log methods for the print/warn/error builtins scripts call in loops
+        self._log_output = self.logger.log_output
+        self._log_warning = self.logger.log_warning
+        self._log_error = self.logger.log_error
         
         # Sandbox configuration
         self.max_memory_mb = 100
@@ -36,26 +152,46 @@ class SandboxManager:
         self.max_execution_time = 30
         self.max_file_operations = 10
         
+        # Functions scripts pass to spawn(), per executing thread. They run
+        # after the script body, before its runtime is reset for reuse.
+        self._spawn_state = threading.local()
+        
+        # Per-thread wait() schedule, so concurrent scripts keep separate
+        # cadences, and the deadline of the script running on the thread
+        self._wait_state = threading.local()
+        
         # Resource monitoring
         self.current_process = psutil.Process()
+        # cpu_percent() reports usage since its previous call and 0.0 on the
+        # first one, so take the baseline now; all later reads go through
+        # _sample_resources, which keeps the intervals from overlapping
+        self.current_process.cpu_percent(interval=None)
         self.resource_monitors = {}
         
+        # Latest resource sample, shared by the monitors and get_resource_usage
+        self._resource_sample = ResourceSample(0, 0.0, 0)
+        self._resource_sample_time = float('-inf')
+        self._resource_sample_lock = threading.Lock()
+        
         # Security restrictions
-        self.blocked_functions = {
+        self.blocked_functions = frozenset(name.lower() for name in (
             'os.execute', 'os.remove', 'os.rename', 'os.tmpname',
             'io.popen', 'io.open', 'io.close', 'io.read', 'io.write',
             'loadstring', 'loadfile', 'dofile', 'require',
             'debug.getinfo', 'debug.getlocal', 'debug.setlocal',
             'collectgarbage', 'coroutine.create', 'coroutine.resume',
             'package.loadlib', 'package.cpath', 'package.path'
-        }
+        ))
+        self._blocked_re = re.compile(
+            '|'.join(map(re.escape, self.blocked_functions)), re.IGNORECASE
+        )
         
         # Safe API functions for Roblox simulation
-        self.safe_roblox_apis = {
+        self.safe_roblox_apis = frozenset((
             'game', 'workspace', 'players', 'player', 'script',
             'Vector3', 'CFrame', 'Color3', 'Instance', 'TweenInfo',
             'wait', 'spawn', 'tick', 'time', 'warn', 'error'
-        }
+        ))
     
     def setup_environment(self, runtime: LuaRuntime) -> None:
         """
@@ -65,58 +201,60 @@ class SandboxManager:
             runtime: The Lua runtime to configure
         """
         try:
-            # Clear all globals first
-            self._clear_globals(runtime)
+            # Clear all globals first, keeping the originals to pick safe ones from
+            original_globals = self._clear_globals(runtime)
             
             # Set up safe globals
-            self._setup_safe_globals(runtime)
+            self._setup_safe_globals(runtime, original_globals)
             
             # Set up Roblox API simulation
-            self._setup_roblox_apis(runtime)
+            self._setup_roblox_apis(runtime, original_globals)
             
             # Set up resource monitoring
             self._setup_resource_monitoring(runtime)
             
+            # Let Lua's allocator enforce the memory budget
+            self._limit_memory(runtime)
+            
             self.logger.log_execution("Sandbox environment configured successfully")
             
         except Exception as e:
             self.logger.log_error(f"Failed to setup sandbox environment: {str(e)}")
             raise
     
-    def _clear_globals(self, runtime: LuaRuntime) -> None:
-        """Clear all globals from the runtime"""
-        globals_table = runtime.globals()
-        for key in list(globals_table.keys()):
-            if key != '_G':  # Keep the global table reference
-                del globals_table[key]
+    def _clear_globals(self, runtime: LuaRuntime) -> Any:
+        """Clear all globals from the runtime, returning a Lua table of what was removed"""
+        return runtime.execute(_CLEAR_GLOBALS_LUA)
     
-    def _setup_safe_globals(self, runtime: LuaRuntime) -> None:
+    def _setup_safe_globals(self, runtime: LuaRuntime, original_globals: Any) -> None:
         """Set up safe global functions and libraries"""
         globals_table = runtime.globals()
         
         # Basic Lua functions (safe subset)
         safe_functions = {
             'print': self._sandboxed_print,
-            'tonumber': globals_table.get('tonumber'),
-            'tostring': globals_table.get('tostring'),
-            'type': globals_table.get('type'),
-            'pairs': globals_table.get('pairs'),
-            'ipairs': globals_table.get('ipairs'),
-            'next': globals_table.get('next'),
-            'select': globals_table.get('select'),
-            'pcall': globals_table.get('pcall'),
-            'xpcall': globals_table.get('xpcall'),
-            'assert': globals_table.get('assert'),
-            'error': globals_table.get('error'),
-            'warn': globals_table.get('warn'),
+            'tonumber': original_globals['tonumber'],
+            'tostring': original_globals['tostring'],
+            'type': original_globals['type'],
+            'pairs': original_globals['pairs'],
+            'ipairs': original_globals['ipairs'],
+            'next': original_globals['next'],
+            'select': original_globals['select'],
+            'pcall': original_globals['pcall'],
+            'xpcall': original_globals['xpcall'],
+            'assert': original_globals['assert'],
+            'error': original_globals['error'],
+            'warn': original_globals['warn'],
         }
         
-        # Safe libraries
+        # Safe libraries, as Lua tables so scripts index them without
+        # crossing into Python. Each is filtered inside Lua in one call.
+        pick_fields = runtime.execute(_PICK_FIELDS_LUA)
         safe_libraries = {
-            'table': self._create_safe_table_lib(globals_table),
-            'string': self._create_safe_string_lib(globals_table),
-            'math': self._create_safe_math_lib(globals_table),
-            'os': self._create_safe_os_lib(globals_table),
+            'table': self._create_safe_table_lib(pick_fields, original_globals),
+            'string': self._create_safe_string_lib(pick_fields, original_globals),
+            'math': self._create_safe_math_lib(pick_fields, original_globals),
+            'os': self._create_safe_os_lib(pick_fields, original_globals),
         }
         
         # Set globals
@@ -127,40 +265,24 @@ class SandboxManager:
         for name, lib in safe_libraries.items():
             globals_table[name] = lib
     
-    def _create_safe_table_lib(self, globals_table) -> Dict[str, Any]:
+    def _create_safe_table_lib(self, pick_fields: Callable, original_globals: Any) -> Any:
         """Create safe table library"""
-        table_lib = globals_table.get('table', {})
-        safe_table = {}
-        
         safe_table_functions = ['insert', 'remove', 'sort', 'concat', 'unpack']
-        for func_name in safe_table_functions:
-            if hasattr(table_lib, func_name):
-                safe_table[func_name] = getattr(table_lib, func_name)
         
-        return safe_table
+        return pick_fields(original_globals['table'], *safe_table_functions)
     
-    def _create_safe_string_lib(self, globals_table) -> Dict[str, Any]:
+    def _create_safe_string_lib(self, pick_fields: Callable, original_globals: Any) -> Any:
         """Create safe string library"""
-        string_lib = globals_table.get('string', {})
-        safe_string = {}
-        
         safe_string_functions = [
             'byte', 'char', 'dump', 'find', 'format', 'gmatch',
             'gsub', 'len', 'lower', 'match', 'rep', 'reverse',
             'sub', 'upper'
         ]
         
-        for func_name in safe_string_functions:
-            if hasattr(string_lib, func_name):
-                safe_string[func_name] = getattr(string_lib, func_name)
-        
-        return safe_string
+        return pick_fields(original_globals['string'], *safe_string_functions)
     
-    def _create_safe_math_lib(self, globals_table) -> Dict[str, Any]:
+    def _create_safe_math_lib(self, pick_fields: Callable, original_globals: Any) -> Any:
         """Create safe math library"""
-        math_lib = globals_table.get('math', {})
-        safe_math = {}
-        
         safe_math_functions = [
             'abs', 'acos', 'asin', 'atan', 'atan2', 'ceil', 'cos',
             'cosh', 'deg', 'exp', 'floor', 'fmod', 'frexp', 'ldexp',
@@ -168,54 +290,59 @@ class SandboxManager:
             'random', 'randomseed', 'sin', 'sinh', 'sqrt', 'tan', 'tanh'
         ]
         
-        for func_name in safe_math_functions:
-            if hasattr(math_lib, func_name):
-                safe_math[func_name] = getattr(math_lib, func_name)
-        
-        # Add math constants
-        safe_math['pi'] = math_lib.get('pi', 3.141592653589793)
-        safe_math['huge'] = math_lib.get('huge', float('inf'))
-        
-        return safe_math
+        # Include the math constants
+        return pick_fields(original_globals['math'], *safe_math_functions, 'pi', 'huge')
     
-    def _create_safe_os_lib(self, globals_table) -> Dict[str, Any]:
+    def _create_safe_os_lib(self, pick_fields: Callable, original_globals: Any) -> Any:
         """Create safe OS library (very restricted)"""
-        os_lib = globals_table.get('os', {})
-        safe_os = {}
-        
         # Only allow time-related functions
         safe_os_functions = ['time', 'date', 'clock']
         
-        for func_name in safe_os_functions:
-            if hasattr(os_lib, func_name):
-                safe_os[func_name] = getattr(os_lib, func_name)
-        
-        return safe_os
+        return pick_fields(original_globals['os'], *safe_os_functions)
     
-    def _setup_roblox_apis(self, runtime: LuaRuntime) -> None:
+    def _setup_roblox_apis(self, runtime: LuaRuntime, original_globals: Any) -> None:
         """Set up simulated Roblox APIs for testing"""
         globals_table = runtime.globals()
         
-        # Simulate basic Roblox objects
-        roblox_apis = {
+        # Simulate basic Roblox objects as Lua tables, so field lookups
+        # like game.Workspace.Name stay inside the Lua VM
+        roblox_objects = {
             'game': self._create_game_object(),
             'workspace': self._create_workspace_object(),
             'players': self._create_players_object(),
             'player': self._create_player_object(),
             'script': self._create_script_object(),
-            'Vector3': self._create_vector3_class(),
-            'CFrame': self._create_cframe_class(),
-            'Color3': self._create_color3_class(),
-            'Instance': self._create_instance_class(),
-            'TweenInfo': self._create_tweeninfo_class(),
+        }
+        
+        # Value constructors are Lua functions, so scripts build these
+        # values without a round trip through Python
+        constructors = runtime.execute(_ROBLOX_CONSTRUCTORS_LUA)
+        
+        run_spawned = runtime.execute(
+            _SPAWN_RUNNER_LUA,
+            original_globals['debug']['sethook'],
+            original_globals['debug']['getinfo'],
+            original_globals['pcall'],
+            original_globals['error'],
+        )
+        
+        roblox_apis = {
+            'Vector3': constructors['Vector3'],
+            'CFrame': constructors['CFrame'],
+            'Color3': constructors['Color3'],
+            'Instance': constructors['Instance'],
+            'TweenInfo': constructors['TweenInfo'],
             'wait': self._sandboxed_wait,
-            'spawn': self._sandboxed_spawn,
+            'spawn': lambda func: self._sandboxed_spawn(func, run_spawned),
             'tick': time.time,
-            'time': time.time,
+            'time': time.monotonic,
             'warn': self._sandboxed_warn,
             'error': self._sandboxed_error,
         }
         
+        for name, obj in roblox_objects.items():
+            globals_table[name] = runtime.table_from(obj, recursive=True)
+        
         for name, api in roblox_apis.items():
             globals_table[name] = api
     
@@ -264,80 +391,135 @@ class SandboxManager:
             'Parent': None,
         }
     
-    def _create_vector3_class(self) -> Callable:
-        """Create Vector3 class"""
-        def vector3_new(x=0, y=0, z=0):
-            return {'X': x, 'Y': y, 'Z': z, 'Magnitude': (x*x + y*y + z*z)**0.5}
-        return vector3_new
-    
-    def _create_cframe_class(self) -> Callable:
-        """Create CFrame class"""
-        def cframe_new(x=0, y=0, z=0):
-            return {'X': x, 'Y': y, 'Z': z, 'Position': {'X': x, 'Y': y, 'Z': z}}
-        return cframe_new
-    
-    def _create_color3_class(self) -> Callable:
-        """Create Color3 class"""
-        def color3_new(r=0, g=0, b=0):
-            return {'R': r, 'G': g, 'B': b}
-        return color3_new
-    
-    def _create_instance_class(self) -> Callable:
-        """Create Instance class"""
-        def instance_new(className):
-            return {'ClassName': className, 'Name': className, 'Parent': None}
-        return instance_new
-    
-    def _create_tweeninfo_class(self) -> Callable:
-        """Create TweenInfo class"""
-        def tweeninfo_new(time=1, style=0):
-            return {'Time': time, 'Style': style}
-        return tweeninfo_new
-    
     def _sandboxed_print(self, *args) -> str:
         """Sandboxed print function"""
-        output = ' '.join(str(arg) for arg in args)
-        self.logger.log_output(f"[SANDBOX] {output}")
+        output = ' '.join(map(str, args))
+        self._log_output(f"[SANDBOX] {output}")
         return output
     
     def _sandboxed_wait(self, seconds: float = 0.03) -> float:
         """Sandboxed wait function"""
         if seconds > 1.0:  # Limit wait time
             seconds = 1.0
-        time.sleep(seconds)
+        
+        # Scripts that mostly sleep rarely reach the timeout hook, so wait()
+        # checks the deadline itself and never sleeps past it
+        check_deadline = getattr(self._wait_state, 'check_deadline', None)
+        if check_deadline is not None:
+            check_deadline()
+        
+        # Schedule against a running deadline rather than sleeping the full
+        # amount, so time the script spends between waits counts towards the
+        # next one. A first wait, or one that fell a whole interval behind,
+        # starts a new schedule from now.
+        now = time.monotonic()
+        deadline = getattr(self._wait_state, 'next_tick', now) + seconds
+        if deadline <= now:
+            deadline = now + seconds
+        self._wait_state.next_tick = deadline
+        if deadline > now:
+            sleep_time = deadline - now
+            if check_deadline is not None:
+                remaining = (self._wait_state.deadline_ns - time.monotonic_ns()) / 1e9
+                sleep_time = min(sleep_time, max(remaining, 0.0))
+            time.sleep(sleep_time)
+            
+            if check_deadline is not None:
+                check_deadline()
         return seconds
     
-    def _sandboxed_spawn(self, func) -> None:
-        """Sandboxed spawn function"""
-        # In a real implementation, this would spawn a new thread
-        # For now, just execute immediately
+    @contextmanager
+    def execution_deadline(self, deadline_ns: int, check_deadline: Callable):
+        """
+        Make wait() on the calling thread honour a running script's deadline.
+        
+        Args:
+            deadline_ns: time.monotonic_ns() value the script must finish by
+            check_deadline: Raises once the deadline has passed
+        """
+        state = self._wait_state
+        state.deadline_ns, state.check_deadline = deadline_ns, check_deadline
         try:
-            func()
-        except Exception as e:
-            self.logger.log_error(f"Spawned function error: {str(e)}")
+            yield
+        finally:
+            state.deadline_ns = state.check_deadline = None
+    
+    def _sandboxed_spawn(self, func, run_spawned) -> None:
+        """Sandboxed spawn function"""
+        # Deferred until the spawning script's body has finished
+        self._pending_spawns().append((func, run_spawned))
+    
+    def _pending_spawns(self) -> deque:
+        """Functions spawned by the script running on the calling thread"""
+        pending = getattr(self._spawn_state, 'pending', None)
+        if pending is None:
+            pending = self._spawn_state.pending = deque()
+        return pending
+    
+    def run_spawned_functions(self, check_deadline: Callable) -> None:
+        """
+        Run the functions the current script spawned, including any they spawn.
+        
+        Args:
+            check_deadline: The script's deadline check; raises once it has timed out
+        """
+        pending = self._pending_spawns()
+        while pending:
+            # Also checked here, since short functions never reach the hook
+            check_deadline()
+            func, run_spawned = pending.popleft()
+            try:
+                run_spawned(func, check_deadline, _SPAWN_HOOK_INSTRUCTIONS)
+            except Exception as e:
+                self._log_error(f"Spawned function error: {self.describe_error(e)}")
+                # A timeout ends the whole execution, not just this function
+                check_deadline()
+    
+    def discard_spawned_functions(self) -> None:
+        """Drop spawned functions that did not get to run"""
+        self._pending_spawns().clear()
     
     def _sandboxed_warn(self, *args) -> str:
         """Sandboxed warn function"""
-        output = ' '.join(str(arg) for arg in args)
-        self.logger.log_warning(f"[SANDBOX] {output}")
+        output = ' '.join(map(str, args))
+        self._log_warning(f"[SANDBOX] {output}")
         return output
     
     def _sandboxed_error(self, *args) -> str:
         """Sandboxed error function"""
-        output = ' '.join(str(arg) for arg in args)
-        self.logger.log_error(f"[SANDBOX] {output}")
+        output = ' '.join(map(str, args))
+        self._log_error(f"[SANDBOX] {output}")
         return output
     
+    def _limit_memory(self, runtime: LuaRuntime) -> None:
+        """Cap what scripts in this runtime may allocate on top of the configured environment"""
+        # LuaJIT can raise allocation failures outside a protected call,
+        # which aborts the whole process instead of failing the script
+        if type(runtime).__module__.startswith('lupa.luajit'):
+            return
+        
+        try:
+            runtime.set_max_memory(self.max_memory_mb * 1024 * 1024, total=False)
+        except RuntimeError as e:
+            # Runtimes created without allocation tracking cannot be capped
+            self.logger.log_warning(f"Sandbox memory limit not applied: {str(e)}")
+    
+    def describe_error(self, error: Exception) -> str:
+        """Message for an error raised by code running in a sandboxed runtime"""
+        # Hitting the allocator cap raises LuaMemoryError without a message
+        if isinstance(error, MemoryError) and not str(error):
+            return f"memory limit exceeded ({self.max_memory_mb} MB)"
+        return str(error)
+    
     def _setup_resource_monitoring(self, runtime: LuaRuntime) -> None:
         """Set up resource monitoring for the sandbox"""
         # Monitor memory usage
         def check_memory():
             try:
-                memory_info = self.current_process.memory_info()
-                memory_mb = memory_info.rss / 1024 / 1024
+                memory_mb = self._sample_resources().memory_mb
                 
                 if memory_mb > self.max_memory_mb:
-                    self.logger.log_warning(f"Memory usage exceeded limit: {memory_mb:.1f}MB")
+                    self.logger.log_warning(f"Memory usage exceeded limit: {memory_mb}MB")
                     return False
                 return True
             except Exception:
@@ -346,7 +528,7 @@ class SandboxManager:
         # Monitor CPU usage
         def check_cpu():
             try:
-                cpu_percent = self.current_process.cpu_percent()
+                cpu_percent = self._sample_resources().cpu_percent
                 if cpu_percent > self.max_cpu_percent:
                     self.logger.log_warning(f"CPU usage exceeded limit: {cpu_percent:.1f}%")
                     return False
@@ -358,6 +540,22 @@ class SandboxManager:
         self.resource_monitors['memory'] = check_memory
         self.resource_monitors['cpu'] = check_cpu
     
+    def _sample_resources(self) -> ResourceSample:
+        """Memory, CPU and thread usage, queried at most once per _RESOURCE_SAMPLE_TTL"""
+        with self._resource_sample_lock:
+            now = time.monotonic()
+            if now - self._resource_sample_time >= _RESOURCE_SAMPLE_TTL:
+                # oneshot() lets psutil read the process status once for all fields
+                with self.current_process.oneshot():
+                    self._resource_sample = ResourceSample(
+                        memory_mb=self.current_process.memory_info().rss >> 20,  # whole MB
+                        cpu_percent=self.current_process.cpu_percent(),
+                        threads=self.current_process.num_threads(),
+                    )
+                self._resource_sample_time = now
+            
+            return self._resource_sample
+    
     @contextmanager
     def resource_monitoring(self):
         """Context manager for resource monitoring"""
@@ -381,46 +579,28 @@ class SandboxManager:
         Returns:
             True if script is safe, False otherwise
         """
-        script_lower = script_content.lower()
-        
         # Check for blocked functions
-        for blocked_func in self.blocked_functions:
-            if blocked_func in script_lower:
-                self.logger.log_error(f"Script contains blocked function: {blocked_func}")
-                return False
+        match = self._blocked_re.search(script_content)
+        if match:
+            self.logger.log_error(f"Script contains blocked function: {match.group(0).lower()}")
+            return False
         
         # Check for suspicious patterns
-        suspicious_patterns = [
-            'while true do',
-            'for i=1,999999 do',
-            'repeat until false',
-            'coroutine',
-            'debug',
-            'collectgarbage',
-            'jit'
-        ]
-        
-        for pattern in suspicious_patterns:
-            if pattern in script_lower:
+        found = {match.group(0).lower() for match in _SUSPICIOUS_RE.finditer(script_content)}
+        for pattern in _SUSPICIOUS_PATTERNS:
+            if pattern in found:
                 self.logger.log_warning(f"Script contains suspicious pattern: {pattern}")
         
         return True
     
-    def get_resource_usage(self) -> Dict[str, float]:
-        """Get current resource usage"""
+    def get_resource_usage(self) -> Optional[ResourceUsage]:
+        """Get current resource usage, or None if the process could not be queried"""
         try:
-            memory_info = self.current_process.memory_info()
-            cpu_percent = self.current_process.cpu_percent()
-            
-            return {
-                'memory_mb': memory_info.rss / 1024 / 1024,
-                'cpu_percent': cpu_percent,
-                'threads': self.current_process.num_threads(),
-                'open_files': len(self.current_process.open_files()),
-            }
+            # Listing open files is costly, so it is only done on request
+            return ResourceUsage(*self._sample_resources(), len(self.current_process.open_files()))
         except Exception as e:
             self.logger.log_error(f"Failed to get resource usage: {str(e)}")
-            return {}
+            return None
     
     def cleanup(self):
         """Cleanup sandbox resources"""
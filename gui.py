@@ -24,7 +24,7 @@ from PyQt6.QtGui import QFont, QPalette, QColor, QIcon
 # Import our modules
 from executor.core import ExecutorCore
 from executor.sandbox import SandboxManager
-from executor.logger import ExecutionLogger
+from executor.logger import get_logger
 from ai_module.ai_interface import AIInterface
 from ai_module.script_builder import ScriptBuilder
 from ai_module.validation import ScriptValidator
@@ -100,10 +100,10 @@ class CIAExecutorGUI(QMainWindow):
         super().__init__()
         self.config = Config()
         self.file_manager = FileManager()
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
         self.ai_interface = AIInterface()
-        self.executor = ExecutorCore()
         self.sandbox = SandboxManager()
+        self.executor = ExecutorCore(sandbox=self.sandbox, logger=self.logger)
         
         self.init_ui()
         self.setup_dark_theme()
@@ -485,6 +485,7 @@ class CIAExecutorGUI(QMainWindow):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.log_message("Application shutting down...")
+            self.ai_interface.close()
             event.accept()
         else:
             event.ignore()
@@ -5,13 +5,15 @@ Command-line interface for the CIA Roblox executor.
 """
 
 import sys
+import time
 import argparse
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from executor.core import ExecutorCore
-from executor.logger import ExecutionLogger
+from executor.logger import get_logger
 from ai_module.ai_interface import AIInterface
 from ai_module.script_builder import ScriptBuilder
 from ai_module.validation import ScriptValidator
@@ -24,12 +26,15 @@ class CIAExecutorCLI:
     
     def __init__(self):
         self.config = Config()
-        self.logger = ExecutionLogger()
-        self.executor = ExecutorCore()
+        self.logger = get_logger()
+        self.executor = ExecutorCore(logger=self.logger)
         self.ai_interface = AIInterface()
         self.script_builder = ScriptBuilder()
         self.validator = ScriptValidator()
         self.file_manager = FileManager()
+        
+        # Background file I/O, kept off the execution path
+        self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='script-io')
     
     def run(self, args):
         """Run the CLI with parsed arguments"""
@@ -53,6 +58,8 @@ class CIAExecutorCLI:
             self.logger.log_error(f"CLI operation failed: {str(e)}")
             print(f"Error: {str(e)}")
             sys.exit(1)
+        finally:
+            self.ai_interface.close()
     
     def generate_script(self, args):
         """Generate a script using AI"""
@@ -89,15 +96,20 @@ class CIAExecutorCLI:
                     print("Use --force to execute anyway")
                     return
             
-            # Save script
+            # Save script in the background; execution works from memory
             script_name = args.output or f"ai_generated_{self._generate_timestamp()}.lua"
-            script_path = self.file_manager.save_generated_script(script_name, script_content)
+            save_future = self._io_executor.submit(
+                self.file_manager.save_generated_script, script_name, script_content
+            )
             
-            print(f"✅ Script generated successfully: {script_path}")
+            try:
+                if args.execute:
+                    print("🚀 Executing generated script...")
+                    self._execute_script_content(script_content, script_name)
+            finally:
+                script_path = save_future.result()
             
-            if args.execute:
-                print("🚀 Executing generated script...")
-                self._execute_script_content(script_content, script_name)
+            print(f"✅ Script generated successfully: {script_path}")
             
         except Exception as e:
             print(f"❌ Script generation failed: {str(e)}")
@@ -288,8 +300,7 @@ class CIAExecutorCLI:
     
     def _generate_timestamp(self) -> str:
         """Generate timestamp string"""
-        from datetime import datetime
-        return datetime.now().strftime('%Y%m%d_%H%M%S')
+        return time.strftime('%Y%m%d_%H%M%S')
     
     def _format_file_size(self, size_bytes: int) -> str:
         """Format file size"""
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session', autouse=True)
+def _work_dir(tmp_path_factory):
+    """Keep the config and log files the executor writes out of the checkout"""
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('work'))
+    yield
+    os.chdir(previous)
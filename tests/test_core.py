@@ -0,0 +1,160 @@
+import importlib
+import threading
+import time
+
+import pytest
+
+from executor import core
+from executor.core import ExecutorCore, ExecutionError
+
+
+@pytest.fixture
+def executor():
+    executor = ExecutorCore()
+    # Run scripts as written; the bypass header returns early when it finds debug
+    executor.bypass_mode = False
+    executor.set_execution_timeout(0.5)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.parametrize('sandbox_mode', [True, False])
+def test_timeout_cannot_be_caught_with_pcall(executor, sandbox_mode):
+    executor.sandbox_mode = sandbox_mode
+    
+    with pytest.raises(ExecutionError, match='timed out'):
+        executor.execute_script('while true do pcall(function() while true do end end) end')
+    
+    # The runtime is left usable for the next script
+    assert executor.execute_script('return 1 + 1') == 'Execution successful. Result: 2'
+
+
+def test_spawned_functions_finish_before_runtime_is_reused(executor):
+    executor.execute_script('spawn(function() leaked = 42 end)')
+    
+    assert executor.execute_script('return tostring(leaked)') == 'Execution successful. Result: nil'
+
+
+def test_spawned_infinite_loop_times_out(executor):
+    with pytest.raises(ExecutionError, match='timed out'):
+        executor.execute_script('spawn(function() while true do pcall(function() while true do end end) end end)')
+
+
+def test_nested_table_changes_do_not_reach_the_next_execution(executor):
+    executor.execute_script(
+        'math.floor = function() return 42 end '
+        'game.Workspace.Name = "pwned" '
+        'game.Workspace.Extra = true'
+    )
+    
+    result = executor.execute_script(
+        'return tostring(math.floor(1.5)) .. " " .. game.Workspace.Name .. " " .. tostring(game.Workspace.Extra)'
+    )
+    
+    assert result == 'Execution successful. Result: 1 Workspace nil'
+
+
+@pytest.mark.parametrize('script', [
+    'print("execute order 66")',
+    'local executeTask = 1',
+    'local t = {} t.debugMode = true',
+])
+def test_names_containing_blocked_words_are_allowed(executor, script):
+    assert executor.execute_script(script) == 'Execution successful. Result: Execution completed'
+
+
+@pytest.mark.parametrize('script', [
+    'os.execute("ls")',
+    'local d = debug',
+    'print("require")',
+])
+def test_blocked_names_are_rejected(executor, script):
+    with pytest.raises(ExecutionError, match='validation failed'):
+        executor.execute_script(script)
+
+
+@pytest.mark.parametrize('lua_module', ['lupa.lua53', 'lupa.lua54', 'lupa.lua55', 'lupa.luajit21'])
+def test_validation_reads_each_lua_versions_bytecode(monkeypatch, lua_module):
+    try:
+        runtime_class = importlib.import_module(lua_module).LuaRuntime
+    except ImportError:
+        pytest.skip(f'{lua_module} is not available')
+    monkeypatch.setattr(core, '_resolve_runtime_class', lambda backend: runtime_class)
+    
+    executor = ExecutorCore()
+    executor.bypass_mode = False
+    try:
+        assert executor._dangerous_name_re is not None
+        for script in ('os.execute("ls")', 'local d = debug', 'local j = jit'):
+            with pytest.raises(ExecutionError, match='validation failed'):
+                executor.execute_script(script)
+        
+        assert executor.execute_script('local executeTask = "execute order 66" return #executeTask') == \
+            'Execution successful. Result: 16'
+    finally:
+        executor.shutdown()
+
+
+def test_only_execution_threads_are_pinned(monkeypatch):
+    pinned = []
+    monkeypatch.setattr(core.os, 'sched_setaffinity',
+                        lambda pid, cpus: pinned.append((threading.get_ident(), cpus)), raising=False)
+    config_get = core.Config.get
+    monkeypatch.setattr(core.Config, 'get', lambda self, key, default=None:
+                        [0] if key == 'executor.cpu_affinity' else config_get(self, key, default))
+    
+    executor = ExecutorCore()
+    try:
+        assert pinned == []
+        executor.set_sandbox_mode(False)
+        worker = threading.Thread(target=executor.execute_script, args=('return 1',))
+        worker.start()
+        worker.join()
+        assert pinned == [(worker.ident, {0})]
+    finally:
+        executor.shutdown()
+
+
+def test_luajit_backend_keeps_bypass_off(monkeypatch):
+    try:
+        runtime_class = importlib.import_module('lupa.luajit21').LuaRuntime
+    except ImportError:
+        pytest.skip('lupa.luajit21 is not available')
+    monkeypatch.setattr(core, '_resolve_runtime_class', lambda backend: runtime_class)
+    
+    executor = ExecutorCore()
+    try:
+        assert not executor.bypass_mode
+        executor.set_bypass_mode(True)
+        assert not executor.bypass_mode
+        assert executor.execute_script('local s = "hello" return #s') == 'Execution successful. Result: 5'
+    finally:
+        executor.shutdown()
+
+
+def test_validation_falls_back_to_source_scan_for_unknown_bytecode(executor):
+    executor._dangerous_name_re = core._dangerous_name_re(lambda source: (b'', b''))
+    assert executor._dangerous_name_re is None
+    
+    with pytest.raises(ExecutionError, match='validation failed'):
+        executor.execute_script('os.execute("ls")')
+
+
+def test_memory_limit_error_names_the_limit(executor):
+    with pytest.raises(ExecutionError, match=r'memory limit exceeded \(100 MB\)'):
+        executor.execute_script('local t = {} for i = 1, 1e8 do t[i] = i end')
+
+
+@pytest.mark.parametrize('script', [
+    'while true do wait() end',
+    'while true do wait(1) end',
+    'while true do pcall(wait, 1) end',
+    'spawn(function() while true do wait(1) end end)',
+])
+def test_timeout_holds_for_scripts_that_wait(executor, script):
+    start = time.monotonic()
+    
+    with pytest.raises(ExecutionError, match='timed out'):
+        executor.execute_script(script)
+    
+    assert time.monotonic() - start < 1.5
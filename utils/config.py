@@ -11,7 +11,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
-from executor.logger import ExecutionLogger
+from executor.logger import get_logger
 
 
 class Config:
@@ -21,7 +21,7 @@ class Config:
     """
     
     def __init__(self, config_path: str = None):
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
         
         # Default config path
         if config_path is None:
@@ -36,6 +36,10 @@ class Config:
                 'version': '1.0.0',
                 'max_execution_time': 30,
                 'max_memory_usage_mb': 100,
+                'lua_backend': 'lua',  # lua, luajit
+                'sandbox_pool_size': 2,
+                'chunk_cache_size': 512,
+                'cpu_affinity': None,  # CPU ids to pin execution threads to
                 'enable_sandbox': True,
                 'enable_bypass': True,
                 'log_level': 'INFO',
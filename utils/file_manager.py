@@ -13,7 +13,7 @@ from datetime import datetime
 import json
 
 from utils.config import Config
-from executor.logger import ExecutionLogger
+from executor.logger import get_logger
 
 
 class FileManager:
@@ -24,7 +24,7 @@ class FileManager:
     
     def __init__(self):
         self.config = Config()
-        self.logger = ExecutionLogger()
+        self.logger = get_logger()
         
         # Get paths from configuration
         paths_config = self.config.get_paths_config()
@@ -33,6 +33,10 @@ class FileManager:
         self.backup_dir = Path(paths_config.get('backup_dir', 'backups'))
         self.temp_dir = Path(paths_config.get('temp_dir', 'temp'))
         
+        # Content-derived script info per path, kept with the file's
+        # (mtime_ns, size) so a changed file is re-read
+        self._script_info_cache: Dict[str, Tuple[Tuple[int, int], Tuple[str, int, Dict[str, Any]]]] = {}
+        
         # Create directories if they don't exist
         self._create_directories()
     
@@ -107,11 +111,10 @@ class FileManager:
         try:
             script_path = Path(script_path)
             
-            if not script_path.exists():
-                raise FileNotFoundError(f"Script file not found: {script_path}")
-            
-            with open(script_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            try:
+                content = self._fast_read(script_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Script file not found: {script_path}") from None
             
             # Extract metadata if present
             metadata = self._extract_metadata(content)
@@ -135,6 +138,38 @@ class FileManager:
             )
             raise
     
+    def _fast_read(self, path: Path) -> str:
+        """Read a UTF-8 text file in one read of its known size"""
+        return self._decode_text(self._read_bytes(path))
+    
+    def _read_bytes(self, path: Path) -> bytes:
+        """Read a whole file in one read of its known size"""
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            size = os.fstat(fd).st_size
+            data = os.read(fd, size)
+            
+            # Large files can come back in more than one read
+            while len(data) < size:
+                chunk = os.read(fd, size - len(data))
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            os.close(fd)
+        
+        return data
+    
+    def _decode_text(self, data: bytes) -> str:
+        """Decode UTF-8 file contents the way text-mode open() would"""
+        content = data.decode('utf-8')
+        
+        # Match text-mode newline handling
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        
+        return content
+    
     def list_scripts(self, directory: str = None) -> List[Dict[str, Any]]:
         """
         List all scripts in the scripts directory.
@@ -305,19 +340,11 @@ class FileManager:
         try:
             script_path = self.scripts_dir / script_name
             
-            if not script_path.exists():
-                raise FileNotFoundError(f"Script not found: {script_name}")
-            
-            stat = script_path.stat()
-            
-            # Read content to extract metadata
-            with open(script_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            metadata = self._extract_metadata(content)
-            
-            # Calculate checksum
-            checksum = hashlib.md5(content.encode()).hexdigest()
+            try:
+                stat = script_path.stat()
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Script not found: {script_name}") from None
+            checksum, line_count, metadata = self._get_content_info(script_path, stat)
             
             info = {
                 'name': script_path.name,
@@ -327,7 +354,7 @@ class FileManager:
                 'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
                 'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
                 'checksum': checksum,
-                'line_count': len(content.split('\n')),
+                'line_count': line_count,
                 'metadata': metadata
             }
             
@@ -340,6 +367,29 @@ class FileManager:
             )
             raise
     
+    def _get_content_info(self, script_path: Path, stat: os.stat_result) -> Tuple[str, int, Dict[str, Any]]:
+        """Checksum, line count and metadata of a script, reusing them while the file is unchanged"""
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._script_info_cache.get(str(script_path))
+        if cached is not None and cached[0] == version:
+            checksum, line_count, metadata = cached[1]
+            return checksum, line_count, dict(metadata)
+        
+        # Read content to extract metadata
+        data = self._read_bytes(script_path)
+        content = self._decode_text(data)
+        
+        metadata = self._extract_metadata(content)
+        
+        # Calculate checksum; without carriage returns the raw bytes are
+        # exactly the encoded text, so hash them instead of re-encoding
+        checksum = hashlib.md5(content.encode() if b'\r' in data else data).hexdigest()
+        
+        line_count = content.count('\n') + 1
+        
+        self._script_info_cache[str(script_path)] = (version, (checksum, line_count, dict(metadata)))
+        return checksum, line_count, metadata
+    
     def search_scripts(self, query: str) -> List[Dict[str, Any]]:
         """
         Search for scripts by content or name.
@@ -367,8 +417,7 @@ class FileManager:
                         continue
                     
                     # Check content
-                    with open(script_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    content = self._fast_read(script_file)
                     
                     if query_lower in content.lower():
                         # Find matching line
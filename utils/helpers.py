@@ -8,8 +8,6 @@ import os
 import sys
 import time
 import hashlib
-import random
-import string
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -25,8 +23,8 @@ def generate_unique_id(prefix: str = "script") -> str:
     Returns:
         Unique identifier string
     """
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
+    timestamp = time.strftime('%Y%m%d_%H%M%S')
+    random_suffix = os.urandom(3).hex()
     return f"{prefix}_{timestamp}_{random_suffix}"
 
 